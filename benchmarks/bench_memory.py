@@ -0,0 +1,40 @@
+# coding: utf-8
+"""
+Measures, with tracemalloc, the memory held by parsed records as regular
+instances, instances of a Meta.slots model and namedtuple records.
+
+    python benchmarks/bench_memory.py
+"""
+import tracemalloc
+
+from layouts import build_line, build_model
+
+
+def measure(function, number):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = function(number)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) / float(number)
+
+
+def main(number=20000):
+    model = build_model(30)
+    slots_model = build_model(30, slots=True)
+    line = build_line(model)
+    results = [
+        ('instances', lambda n: [model(string=line) for _ in range(n)]),
+        ('slots', lambda n: [slots_model(string=line) for _ in range(n)]),
+        ('namedtuples', lambda n: [
+            model(string=line).to_record() for _ in range(n)]),
+    ]
+    print('30 fields, %d records' % number)
+    for name, function in results:
+        print('%-14s %8.0f bytes/record' % (
+            name + ':', measure(function, number)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# coding: utf-8
+"""
+Compares the generated parser used by LineManager(string=...), a
+projection of 4 fields, the generic single pass parse plan and the previous
+slice, populate and clean traversal, plus the generated and generic
+to_string.
+
+    python benchmarks/bench_parse.py
+"""
+import timeit
+
+from layouts import build_line, build_model
+
+
+def triple_traversal(model, line):
+    instance = model.__new__(model)
+    instance._validate_string(line)
+    for name, start, end, field in model._meta.parse_plan:
+        setattr(instance, name, line[start:end])
+    instance.clean_fields()
+
+
+def generic_parse(model, line):
+    instance = model.__new__(model)
+    instance._parse_and_clean(line)
+
+
+def main(number=20000):
+    model = build_model(30)
+    line = build_line(model)
+    raw = line.encode('latin-1')
+    instance = model(string=line)
+    projection = model.only(*list(model._meta.fields)[:4])
+    results = [
+        ('generated parse', lambda: model(string=line)),
+        ('generated bytes', lambda: model(string=raw)),
+        ('projection of 4', lambda: projection.parse(raw)),
+        ('parse plan', lambda: generic_parse(model, line)),
+        ('triple traversal', lambda: triple_traversal(model, line)),
+        ('generated to_string', instance._fast_to_string),
+        ('generic to_string', lambda: ''.join(
+            [f.value_to_string(instance)
+             for f in model._meta.fields.values()])),
+    ]
+    print('30 fields, %d records' % number)
+    for name, function in results:
+        elapsed = timeit.timeit(function, number=number)
+        print('%-20s %10.0f records/s' % (name + ':', number / elapsed))
+
+
+if __name__ == '__main__':
+    main()
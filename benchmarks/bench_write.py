@@ -0,0 +1,41 @@
+# coding: utf-8
+"""
+Compares LineManager.write_many with a loop of to_string() calls.
+
+    python benchmarks/bench_write.py
+"""
+import io
+import timeit
+
+from layouts import build_line, build_model
+
+
+def to_string_loop(model, rows, stream):
+    for row in rows:
+        stream.write((model(**row).to_string() + '\r\n').encode('latin-1'))
+
+
+def main(number=20000):
+    model = build_model(30)
+    instance = model(string=build_line(model))
+    row = dict((name, getattr(instance, name)) for name in model._meta.fields)
+    rows = [row] * number
+    instances = [instance] * number
+    results = [
+        ('to_string loop',
+         lambda: to_string_loop(model, rows, io.BytesIO())),
+        ('write_many dicts',
+         lambda: model.write_many(rows, io.BytesIO())),
+        ('write_many instances',
+         lambda: model.write_many(instances, io.BytesIO())),
+        ('write_many trusted',
+         lambda: model.write_many(rows, io.BytesIO(), validate=False)),
+    ]
+    print('30 fields, %d records' % number)
+    for name, function in results:
+        elapsed = timeit.timeit(function, number=1)
+        print('%-22s %10.0f records/s' % (name + ':', number / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# coding: utf-8
+"""
+Synthetic layouts for the benchmarks, cycling through every field type.
+"""
+import datetime
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fixedwidthtext import fields  # noqa
+from fixedwidthtext.models import LineManager  # noqa
+
+FIELD_TYPES = (
+    ('char', lambda: fields.CharField(size=10), 'abc'),
+    ('int', lambda: fields.IntegerField(size=8), 1234),
+    ('dec', lambda: fields.DecimalField(size=12, decimal_places=2),
+     Decimal('1234.56')),
+    ('date', lambda: fields.DateField(), datetime.date(2016, 6, 4)),
+    ('time', lambda: fields.TimeField(), datetime.time(12, 30)),
+)
+
+
+def build_model(count, **meta):
+    attrs = {'__module__': __name__, 'Meta': type('Meta', (), meta)}
+    for i in range(count):
+        kind, factory, value = FIELD_TYPES[i % len(FIELD_TYPES)]
+        attrs['%s_%d' % (kind, i)] = factory()
+    suffix = ''.join('_%s' % key for key in sorted(meta))
+    return type('Layout%d%s' % (count, suffix), (LineManager,), attrs)
+
+
+def build_values(model):
+    values = {}
+    for i, name in enumerate(model._meta.fields):
+        values[name] = FIELD_TYPES[i % len(FIELD_TYPES)][2]
+    return values
+
+
+def build_line(model):
+    return model(**build_values(model)).to_string()
@@ -0,0 +1,129 @@
+# coding: utf-8
+"""
+Reproducible benchmark suite for the parse, validate and write hot paths.
+
+Runs synthetic layouts of 5, 30 and 200 fields mixing every field type and
+reports records/s, bytes/s and memory per record. Results are saved as
+JSON so two commits can be compared:
+
+    python benchmarks/suite.py --output before.json
+    git checkout other-branch
+    python benchmarks/suite.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from layouts import build_line, build_model, build_values
+
+WIDTHS = (5, 30, 200)
+
+
+def _cases(model):
+    line = build_line(model)
+    raw = line.encode('latin-1')
+    values = build_values(model)
+    instance = model(string=line)
+    return [
+        ('parse', lambda: model(string=line)),
+        ('parse_bytes', lambda: model(string=raw)),
+        ('validate', lambda: model(**values)),
+        ('clean_fields', instance.clean_fields),
+        ('to_string', instance.to_string),
+        ('get_dicts', instance.get_dicts),
+    ]
+
+
+def _rate(function, min_time):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return number / elapsed
+        number *= 2
+
+
+def _memory(model, number=2000):
+    line = build_line(model)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [model(string=line) for _ in range(number)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) / float(number)
+
+
+def run(widths=WIDTHS, min_time=0.2):
+    results = {}
+    for width in widths:
+        model = build_model(width)
+        size = model._meta.total_size
+        for case, function in _cases(model):
+            rate = _rate(function, min_time)
+            results['%s/%d' % (case, width)] = {
+                'records_per_sec': rate,
+                'bytes_per_sec': rate * size,
+            }
+        results['memory/%d' % width] = {
+            'bytes_per_record': _memory(model)}
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.STDOUT).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline):
+    print('%-36s %14s %14s %8s' % ('benchmark', 'baseline', 'current',
+                                   'ratio'))
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, value in sorted(current.items()):
+            old = previous.get(metric)
+            if not old:
+                continue
+            print('%-36s %14.0f %14.0f %7.2fx' % (
+                '%s %s' % (name, metric), old, value, value / old))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output', help='save results as JSON')
+    parser.add_argument('--compare', help='JSON results to compare with')
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--widths', type=int, nargs='+', default=WIDTHS)
+    args = parser.parse_args(argv)
+
+    results = run(args.widths, args.min_time)
+    for name, metrics in sorted(results.items()):
+        print('%-20s %s' % (name, '  '.join(
+            '%s=%.0f' % item for item in sorted(metrics.items()))))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': _commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results}, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# coding: utf-8
+"""
+asyncio support: reads records from a StreamReader and writes them to a
+StreamWriter, handing large batches to an executor so parsing and
+formatting do not block the event loop. Requires Python 3.6+.
+"""
+import asyncio
+from collections import deque
+
+from fixedwidthtext import exceptions, streams
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_EXECUTOR_THRESHOLD = 200
+
+
+def parse_batch(model, batch):
+    records = []
+    for line_number, line in batch:
+        try:
+            records.append(model(string=line))
+        except exceptions.ValidationError as e:
+            raise exceptions.ValidationError(
+                e.message, code=e.code, line_number=line_number)
+    return records
+
+
+class RecordStream(object):
+    """
+    Asynchronous iterator of instances of `model` read from `reader`, any
+    object with a coroutine read(n) such as asyncio.StreamReader. Records
+    are split on newlines or, when `newline` is False, every total_size
+    characters plus the terminator found after the first record, if any.
+    Batches of at least `executor_threshold` lines are parsed in `executor`
+    (the loop default when None).
+    """
+    def __init__(self, model, reader, chunk_size=64 * 1024, newline=True,
+                 batch_size=DEFAULT_BATCH_SIZE, executor=None,
+                 executor_threshold=DEFAULT_EXECUTOR_THRESHOLD):
+        self.model = model
+        self.reader = reader
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.executor = executor
+        self.executor_threshold = executor_threshold
+        # In stride mode, the splitter is built once the first record was
+        # read and its terminator is known.
+        self.splitter = streams.LineSplitter() if newline else None
+        self._lines = []
+        self._records = deque()
+        self._eof = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._records:
+            if self._eof and not self._lines:
+                raise StopAsyncIteration
+            await self._fill()
+        return self._records.popleft()
+
+    async def _read_head(self):
+        size = self.model._meta.total_size
+        head = await self.reader.read(self.chunk_size)
+        while head and len(head) < size + 2:
+            chunk = await self.reader.read(self.chunk_size)
+            if not chunk:
+                break
+            head += chunk
+        skip = len(streams._terminator_after(head, size))
+        self.splitter = streams.FixedSplitter(size, skip)
+        return head
+
+    async def _fill(self):
+        while not self._eof and len(self._lines) < self.batch_size:
+            if self.splitter is None:
+                chunk = await self._read_head()
+            else:
+                chunk = await self.reader.read(self.chunk_size)
+            if not chunk:
+                self._eof = True
+                self._lines.extend(self.splitter.close())
+            else:
+                self._lines.extend(self.splitter.feed(chunk))
+        batch = self._lines[:self.batch_size]
+        del self._lines[:self.batch_size]
+        if len(batch) >= self.executor_threshold:
+            loop = asyncio.get_event_loop()
+            records = await loop.run_in_executor(
+                self.executor, parse_batch, self.model, batch)
+        else:
+            records = parse_batch(self.model, batch)
+        self._records.extend(records)
+
+
+async def _aiter(records):
+    if hasattr(records, '__aiter__'):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
+
+
+def format_batch(model, batch, line_terminator, encoding, validate):
+    lines = [model._record_to_string(record, validate) for record in batch]
+    block = line_terminator.join(lines) + line_terminator
+    return block.encode(encoding)
+
+
+async def write_many(model, records, writer, line_terminator='\r\n',
+                     encoding=None, validate=True,
+                     batch_size=DEFAULT_BATCH_SIZE, executor=None,
+                     executor_threshold=DEFAULT_EXECUTOR_THRESHOLD):
+    """
+    Writes `records` (an iterable or an asynchronous iterable of instances,
+    dicts or tuples, as in LineManager.write_many) to `writer`, any object
+    with write(bytes) and optionally a coroutine drain(), such as
+    asyncio.StreamWriter. Returns the number of lines written. Lines are
+    encoded in `encoding`, by default the model's Meta.encoding.
+    """
+    encoding = encoding or model._meta.encoding
+    count = 0
+    drain = getattr(writer, 'drain', None)
+    loop = asyncio.get_event_loop()
+
+    async def flush(batch):
+        if len(batch) >= executor_threshold:
+            block = await loop.run_in_executor(
+                executor, format_batch, model, batch, line_terminator,
+                encoding, validate)
+        else:
+            block = format_batch(
+                model, batch, line_terminator, encoding, validate)
+        writer.write(block)
+        if drain is not None:
+            await drain()
+
+    batch = []
+    async for record in _aiter(records):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            await flush(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+        count += len(batch)
+    return count
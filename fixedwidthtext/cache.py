@@ -0,0 +1,33 @@
+# coding: utf-8
+from collections import OrderedDict
+
+try:
+    from functools import lru_cache
+except ImportError:  # Python 2
+    lru_cache = None
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+def memoize(function, maxsize=DEFAULT_CACHE_SIZE):
+    """
+    Wraps a function of one hashable argument with a bounded least recently
+    used cache. A `maxsize` of 0 disables the cache.
+    """
+    if not maxsize:
+        return function
+    if lru_cache is not None:
+        return lru_cache(maxsize)(function)
+
+    cache = OrderedDict()
+
+    def wrapper(value):
+        try:
+            result = cache.pop(value)
+        except KeyError:
+            result = function(value)
+            if len(cache) >= maxsize:
+                cache.popitem(last=False)
+        cache[value] = result
+        return result
+    return wrapper
@@ -0,0 +1,203 @@
+# coding: utf-8
+"""
+Generates specialized parse and serialize functions for each model, with
+field offsets and formatting masks inlined as constants, in the same spirit
+as dataclasses and attrs. Fields that cannot be expressed as a plain
+expression (choices, validators, custom subclasses...) fall back to their
+generic clean() and value_to_string() methods inside the generated code.
+"""
+import datetime
+import decimal
+import keyword
+import re
+
+from fixedwidthtext.fields import EXACT
+from fixedwidthtext.transliterate import to_ascii
+
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def can_compile(meta):
+    for name in meta.fields:
+        if not IDENTIFIER.match(name) or keyword.iskeyword(name):
+            return False
+    return True
+
+
+def _namespace(meta):
+    namespace = {
+        'datetime': datetime, 'decimal': decimal, 'EXACT': EXACT,
+        'to_ascii': to_ascii}
+    for index, field in enumerate(meta.fields.values()):
+        namespace['f%d' % index] = field
+    return namespace
+
+
+def _compile(source, name, namespace):
+    code = compile(source, '<fixedwidthtext %s>' % name, 'exec')
+    exec(code, namespace)
+    function = namespace[name]
+    function.__source__ = source
+    return function
+
+
+def _field_source(field, index, start, end, expression, fallback, owner):
+    raw = 'string[%d:%d]' % (start, end)
+    source = expression(field, raw, 'f%d' % index)
+    if source is None:
+        return 'f%d.clean(%s, %s)' % (index, fallback % raw, owner)
+    if field.choices:
+        return 'f%d.check_choice(%s)' % (index, source)
+    return source
+
+
+def _parse_lines(meta, function, expression, fallback):
+    lines = [
+        'def %s(self, string):' % function,
+        '    if len(string) != %d:' % meta.total_size,
+        '        self._validate_string(string)',
+        '    try:']
+    for index, (name, start, end, field) in enumerate(meta.parse_plan):
+        source = _field_source(
+            field, index, start, end, expression, fallback, 'self')
+        lines.append('        self.%s = %s' % (name, source))
+    lines.extend([
+        '    except Exception:',
+        '        self._parse_and_clean(%s)' % (fallback % 'string'),
+        ''])
+    return lines
+
+
+def build_parse(meta):
+    """
+    Returns a `_fast_parse(self, string)` function that slices and cleans
+    every field in one statement each. Any error reruns the generic
+    `_parse_and_clean` so error messages are exactly the same.
+    """
+    lines = _parse_lines(
+        meta, '_fast_parse',
+        lambda field, raw, ref: field.parse_source(raw, ref), '%s')
+    return _compile('\n'.join(lines), '_fast_parse', _namespace(meta))
+
+
+def build_parse_bytes(meta):
+    """
+    Returns a `_fast_parse_bytes(self, string)` function, the same as
+    `_fast_parse` for lines of bytes in the single byte `meta.encoding`.
+    Integers, decimals and dates are converted straight from the bytes and
+    only text fields are decoded.
+    """
+    encoding = meta.encoding
+    lines = _parse_lines(
+        meta, '_fast_parse_bytes',
+        lambda field, raw, ref: field.parse_bytes_source(
+            raw, ref, encoding),
+        '%%s.decode(%r)' % encoding)
+    return _compile('\n'.join(lines), '_fast_parse_bytes', _namespace(meta))
+
+
+def build_projection(meta, names, generic, record_class, encoding=None):
+    """
+    Returns a `_projection(string)` function that slices and cleans only
+    the fields `names` and returns them as a `record_class`. With
+    `encoding`, a single byte encoding, it parses lines of bytes instead.
+    Any error, including a line of the wrong size, reruns `generic`.
+    """
+    indexes = dict(
+        (name, index) for index, name in enumerate(meta.fields))
+    if encoding is None:
+        expression = (
+            lambda field, raw, ref: field.parse_source(raw, ref))
+        fallback = '%s'
+    else:
+        expression = (
+            lambda field, raw, ref: field.parse_bytes_source(
+                raw, ref, encoding))
+        fallback = '%%s.decode(%r)' % encoding
+    lines = [
+        'def _projection(string):',
+        '    if len(string) != %d:' % meta.total_size,
+        '        return generic(%s)' % (fallback % 'string'),
+        '    try:',
+        '        return Record(']
+    for name in names:
+        start, end, field = meta.offsets[name]
+        lines.append('            %s,' % _field_source(
+            field, indexes[name], start, end, expression, fallback, 'None'))
+    lines.extend([
+        '        )',
+        '    except Exception:',
+        '        return generic(%s)' % (fallback % 'string'),
+        ''])
+    namespace = _namespace(meta)
+    namespace.update({'generic': generic, 'Record': record_class})
+    return _compile('\n'.join(lines), '_projection', namespace)
+
+
+def build_where(terms):
+    """
+    Returns a `_where(string)` function that tests the raw slices of a
+    line against `terms`, a sequence of (start, end, operator, operand)
+    where operator is '==', 'in' or 'call'. Tests are chained with `and`
+    so the first mismatch ends the evaluation.
+    """
+    namespace = {}
+    tests = []
+    for index, (start, end, operator, operand) in enumerate(terms):
+        raw = 'string[%d:%d]' % (start, end)
+        namespace['c%d' % index] = operand
+        if operator == 'call':
+            tests.append('c%d(%s)' % (index, raw))
+        else:
+            tests.append('%s %s c%d' % (raw, operator, index))
+    lines = [
+        'def _where(string):',
+        '    return %s' % (' and '.join(tests) or 'True'),
+        '']
+    return _compile('\n'.join(lines), '_where', namespace)
+
+
+def _format_lines(meta, load, generic):
+    lines = []
+    parts = []
+    for index, (name, start, end, field) in enumerate(meta.parse_plan):
+        var = 'v%d' % index
+        expression = field.format_source(var, 'f%d' % index)
+        if expression is None:
+            parts.append(generic % {'index': index, 'name': name})
+            continue
+        if field.normalize:
+            expression = 'to_ascii(%s)' % expression
+        lines.append('    %s = %s' % (var, load % {
+            'index': index, 'name': name}))
+        if field.has_default():
+            lines.append('    if %s is None:' % var)
+            lines.append('        %s = f%d.get_default()' % (var, index))
+        parts.append(expression)
+    lines.append("    return ''.join((%s))" % ''.join(
+        '%s, ' % part for part in parts))
+    lines.append('')
+    return lines
+
+
+def build_to_string(meta):
+    """
+    Returns a `_fast_to_string(self)` function that formats every field
+    and joins them once.
+    """
+    lines = ['def _fast_to_string(self):']
+    lines.extend(_format_lines(
+        meta, 'self.%(name)s', 'f%(index)d.value_to_string(self)'))
+    return _compile('\n'.join(lines), '_fast_to_string', _namespace(meta))
+
+
+def build_format(meta):
+    """
+    Returns a `_fast_format(values)` function that formats a sequence of
+    values, in field order, without building a model instance.
+    """
+    lines = ['def _fast_format(values):']
+    lines.extend(_format_lines(
+        meta, 'values[%(index)d]',
+        'f%(index)d.format_value(values[%(index)d])'))
+    return _compile('\n'.join(lines), '_fast_format', _namespace(meta))
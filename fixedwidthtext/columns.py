@@ -0,0 +1,343 @@
+# coding: utf-8
+"""
+Decodes a whole file into one NumPy array per field, and writes columns of
+values back, without building an instance per record. NumPy (and pandas,
+for DataFrames) are optional dependencies: pip install fixedwidthtext[numpy].
+"""
+from collections import OrderedDict
+import datetime
+import decimal
+
+import six
+
+from fixedwidthtext import exceptions, fields, streams, transliterate
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('read_columns requires numpy, please install it.')
+
+
+def record_dtype(model, stride):
+    """
+    Structured dtype with one fixed size bytes column per field, at the
+    field offsets, and `stride` bytes per record.
+    """
+    _require_numpy()
+    plan = model._meta.parse_plan
+    return numpy.dtype({
+        'names': [name for name, start, end, field in plan],
+        'formats': ['S%d' % field.size for name, start, end, field in plan],
+        'offsets': [start for name, start, end, field in plan],
+        'itemsize': stride})
+
+
+def _to_int(raw, field):
+    try:
+        return raw.astype(numpy.int64)
+    except ValueError as e:
+        raise exceptions.ValidationError(
+            '%s: %s' % (field.name, e))
+
+
+def _components(raw, field):
+    """
+    Integer arrays of each component of the field format, such as 'year'
+    and 'month', cut from the raw column at `field.format_slices`.
+    """
+    chars = numpy.ascontiguousarray(raw).view('S1').reshape(
+        len(raw), field.size)
+    parts = {}
+    for component, start, end in field.format_slices:
+        digits = numpy.ascontiguousarray(chars[:, start:end])
+        parts[component] = _to_int(
+            digits.view('S%d' % (end - start)).ravel(), field)
+    return parts
+
+
+def _to_date(raw, field):
+    parts = _components(raw, field)
+    years = parts.get('year')
+    if years is None:
+        years = parts['year2']
+        years = years + numpy.where(years >= 69, 1900, 2000)
+    months, days = parts['month'], parts['day']
+    valid = (months >= 1) & (months <= 12) & (days >= 1)
+    months = numpy.where(valid, months, 1)
+    month_start = ((years - 1970).astype('datetime64[Y]') +
+                   (months - 1).astype('timedelta64[M]'))
+    dates = (month_start.astype('datetime64[D]') +
+             (days - 1).astype('timedelta64[D]'))
+    valid &= dates.astype('datetime64[M]') == month_start
+    return numpy.where(valid, dates, numpy.datetime64('NaT'))
+
+
+def _to_time(raw, field):
+    parts = _components(raw, field)
+    hours, minutes = parts['hour'], parts['minute']
+    valid = (hours < 24) & (minutes < 60)
+    if 'second' in parts:
+        seconds = parts['second']
+        valid &= seconds < 60
+        times = (hours * 3600 + minutes * 60 + seconds).astype(
+            'timedelta64[s]')
+        return numpy.where(valid, times, numpy.timedelta64('NaT', 's'))
+    times = (hours * 60 + minutes).astype('timedelta64[m]')
+    return numpy.where(valid, times, numpy.timedelta64('NaT', 'm'))
+
+
+def _to_text(raw, encoding):
+    return numpy.char.strip(numpy.char.decode(raw, encoding))
+
+
+def _to_objects(raw, field, encoding):
+    values = [field.to_python(value.decode(encoding)) for value in raw]
+    return numpy.array(values, dtype=object)
+
+
+def convert(raw, field, encoding):
+    """
+    Vectorized conversion of a bytes column: IntegerField to int64,
+    DecimalField to int64 scaled by 10 ** decimal_places, DateField to
+    datetime64[D] and TimeField to timedelta64[m], or timedelta64[s] for
+    formats with seconds (NaT for invalid values), following the field
+    format, and CharField to str. Other fields are converted one value at
+    a time.
+    """
+    if isinstance(field, (fields.IntegerField, fields.DecimalField)):
+        return _to_int(raw, field)
+    if isinstance(field, fields.DateField):
+        return _to_date(raw, field)
+    if isinstance(field, fields.TimeField):
+        return _to_time(raw, field)
+    if isinstance(field, fields.CharField):
+        return _to_text(raw, encoding)
+    return _to_objects(raw, field, encoding)
+
+
+def read_columns(model, source, encoding=None, as_dataframe=False):
+    """
+    Returns a dict mapping field names to arrays, or a pandas DataFrame if
+    `as_dataframe` is True, for every record of `source`. `encoding`
+    defaults to Meta.encoding and must be single byte. A last record
+    shorter than total_size raises ValidationError.
+    """
+    _require_numpy()
+    encoding = streams.byte_encoding(model, encoding, 'read_columns')
+    size = model._meta.total_size
+    fileobj, should_close = streams.open_source(source)
+    try:
+        terminator = streams.detect_terminator(fileobj, size)
+        data = fileobj.read()
+    finally:
+        if should_close:
+            fileobj.close()
+    stride = size + len(terminator)
+    count, tail = divmod(len(data), stride)
+    if tail and tail < size:
+        raise exceptions.ValidationError(
+            'String with wrong size, needed: %s, passed: %s' % (size, tail),
+            code='size', line_number=count + 1)
+    if tail:
+        # Only the terminator of the last record is missing.
+        data += b' ' * (stride - tail)
+    records = numpy.frombuffer(data, dtype=record_dtype(model, stride))
+    columns = OrderedDict(
+        (name, convert(records[name], field, encoding))
+        for name, field in model._meta.fields.items())
+    if as_dataframe:
+        import pandas
+        return pandas.DataFrame(columns, columns=list(model._meta.fields))
+    return columns
+
+
+def _as_array(column):
+    if numpy is None or isinstance(column, (list, tuple)):
+        return column
+    if hasattr(column, 'dtype') or hasattr(column, 'typecode'):
+        return numpy.asarray(column)
+    return column
+
+
+def _digits(values, field):
+    """
+    Zero padded digits of an array of non negative integers, or None when
+    some value does not fit and the generic path must report it.
+    """
+    size = field.size
+    if size > 18 or not len(values):
+        return None
+    if values.min() < 0 or values.max() >= 10 ** size:
+        return None
+    digits = numpy.empty((len(values), size), dtype=numpy.uint8)
+    values = values.astype(numpy.int64)
+    for index in range(size - 1, -1, -1):
+        values, digits[:, index] = numpy.divmod(values, 10)
+    digits += 48
+    return digits.tobytes()
+
+
+def _format_distinct(field, values, encoding):
+    """
+    Formats each distinct value once and gathers the results, for the
+    dates and times that files repeat.
+    """
+    distinct, inverse = numpy.unique(values, return_inverse=True)
+    try:
+        table = [field.format_value(value).encode(encoding)
+                 for value in _python_values(field, distinct)]
+    except Exception:
+        return None
+    if [raw for raw in table if len(raw) != field.size]:
+        return None
+    return numpy.array(table, dtype='S%d' % field.size)[inverse].tobytes()
+
+
+def _format_vectorized(field, values, encoding):
+    if field.static_val is not None or field.normalize:
+        return None
+    kind = values.dtype.kind
+    if kind in 'iu' and type(field) is fields.IntegerField:
+        return _digits(values, field)
+    if kind in 'iu' and type(field) is fields.DecimalField:
+        return _digits(values, field)
+    if kind in 'Mm' and isinstance(field, fields.TemporalField):
+        return _format_distinct(field, values, encoding)
+    return None
+
+
+def _python_values(field, values):
+    if numpy is not None and hasattr(values, 'dtype'):
+        if values.dtype.kind == 'M':
+            return values.astype('datetime64[D]').astype(object)
+        if values.dtype.kind == 'm' and isinstance(field, fields.TimeField):
+            seconds = values.astype('timedelta64[s]').astype(numpy.int64)
+            return [None if missing else datetime.time(
+                        value // 3600, value // 60 % 60, value % 60)
+                    for value, missing in zip(
+                        seconds.tolist(), numpy.isnat(values).tolist())]
+        values = values.tolist()
+    if isinstance(field, fields.DecimalField) and not field.as_integer:
+        # Integers are scaled, as read_columns() returns them.
+        places = field._get_places()
+        return [decimal.Decimal(value).scaleb(-places, fields.EXACT)
+                if isinstance(value, six.integer_types) else value
+                for value in values]
+    return values
+
+
+def _format_column(model, field, column, count, encoding):
+    if column is None:
+        try:
+            text = field.format_value(None) * count
+        except Exception as e:
+            raise exceptions.ValidationError(
+                repr({field.name: 'Missing column without a default: %s' %
+                      e}), code='required')
+    else:
+        values = _as_array(column)
+        if numpy is not None and hasattr(values, 'dtype'):
+            data = _format_vectorized(field, values, encoding)
+            if data is not None:
+                return data
+        try:
+            text = ''.join([field.format_value(value)
+                            for value in _python_values(field, values)])
+        except Exception:
+            _check_column(model, field, column, encoding)
+            raise
+    if model._meta.normalize:
+        text = transliterate.transliterate(text)
+    data = text.encode(encoding)
+    if len(data) != count * field.size:
+        _check_column(model, field, column, encoding)
+    return data
+
+
+def _check_column(model, field, column, encoding):
+    values = _python_values(field, _as_array(column))
+    for index, value in enumerate(values):
+        try:
+            text = field.format_value(value)
+        except Exception as e:
+            raise exceptions.ValidationError(
+                repr({field.name: str(e)}),
+                code=getattr(e, 'code', None) or 'invalid',
+                line_number=index + 1)
+        if model._meta.normalize:
+            text = transliterate.to_ascii(text)
+        if len(text.encode(encoding)) != field.size:
+            raise exceptions.ValidationError(
+                repr({field.name: (
+                    'Wrong formated size, size: %s, formated value: %s, '
+                    'formated size: %s' % (field.size, text, len(text)))}),
+                code='max_size', line_number=index + 1)
+
+
+def format_columns(model, columns, line_terminator='\r\n', encoding=None):
+    """
+    Returns the fixed width lines of `columns`, a dict or DataFrame mapping
+    field names to lists, array.array or NumPy arrays of the same length,
+    as one bytearray of n * (total_size + len(line_terminator)) bytes.
+
+    Each column is formatted in bulk and copied into the buffer with one
+    strided slice assignment per character of the field. Values mean the
+    same as in format_value(), except that integers of a DecimalField are
+    always scaled by 10 ** decimal_places, as read_columns() returns them,
+    so its output is written back unchanged. With NumPy, integer arrays of
+    IntegerField and DecimalField are formatted with vectorized arithmetic,
+    and datetime64 and timedelta64 columns of dates and times are formatted
+    once per distinct value. Other columns go through Field.format_value()
+    one value at a time. Fields without a column are written with their
+    static value or default.
+
+    Values are trusted, as in format_row(): only widths are checked.
+    """
+    encoding = streams.byte_encoding(model, encoding, 'write_columns')
+    unknown = [name for name in columns if name not in model._meta.fields]
+    if unknown:
+        raise exceptions.ValidationError(
+            'Unknown fields for %s: %s' % (
+                model.__name__, ', '.join(sorted(unknown))),
+            code='invalid_field')
+    lengths = set(len(columns[name]) for name in columns)
+    if len(lengths) > 1:
+        raise exceptions.ValidationError(
+            'Columns must have the same length, passed: %s' % ', '.join(
+                '%s=%s' % (name, len(columns[name]))
+                for name in columns))
+    count = lengths.pop() if lengths else 0
+    terminator = line_terminator.encode(encoding)
+    size = model._meta.total_size
+    stride = size + len(terminator)
+    buffer = bytearray(count * stride)
+    for name, start, end, field in model._meta.parse_plan:
+        column = columns[name] if name in columns else None
+        data = _format_column(model, field, column, count, encoding)
+        for offset in range(field.size):
+            buffer[start + offset::stride] = data[offset::field.size]
+    for offset in range(len(terminator)):
+        buffer[size + offset::stride] = terminator[offset:offset + 1] * count
+    return buffer
+
+
+def write_columns(model, columns, target, line_terminator='\r\n',
+                  encoding=None):
+    """
+    Writes format_columns() to `target`, a path or a file object opened in
+    binary mode, in a single write, and returns the number of lines.
+    """
+    buffer = format_columns(model, columns, line_terminator, encoding)
+    fileobj, should_close = streams.open_source(target, 'wb')
+    try:
+        fileobj.write(buffer)
+    finally:
+        if should_close:
+            fileobj.close()
+    stride = model._meta.total_size + len(line_terminator)
+    return len(buffer) // stride if stride else 0
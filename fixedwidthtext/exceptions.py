@@ -1,2 +1,18 @@
 class ValidationError(Exception):
-    pass
+    def __init__(self, message, code=None, params=None, line_number=None):
+        super(ValidationError, self).__init__(message)
+        self.message = message
+        self.code = code
+        self.params = params
+        self.line_number = line_number
+
+    @property
+    def messages(self):
+        if isinstance(self.message, list):
+            return self.message
+        return [self.message]
+
+    def __str__(self):
+        if self.line_number is None:
+            return str(self.message)
+        return 'Line %s: %s' % (self.line_number, self.message)
@@ -1,11 +1,17 @@
 # coding: utf-8
 import datetime
 import decimal
-import unicodedata
 
 import six
 
-from fixedwidthtext import exceptions
+from fixedwidthtext import cache, exceptions, transliterate
+
+
+# Scaling by powers of ten must not round to the default 28 digits.
+EXACT = decimal.Context(
+    prec=getattr(decimal, 'MAX_PREC', 999999999),
+    Emax=getattr(decimal, 'MAX_EMAX', 999999999),
+    Emin=getattr(decimal, 'MIN_EMIN', -999999999))
 
 
 class Field(object):
@@ -27,6 +33,9 @@ class Field(object):
         self.verbose_name = kwargs.get('verbose_name', None)
         self.size = kwargs.get('size', kwargs.get('max_length', None))
         self.choices = kwargs.get('choices', None)
+        self.choice_values = frozenset(
+            choice[0] for choice in self.choices or ())
+        self.choice_labels = dict(self.choices or ())
         self.default = kwargs.get('default', None)
         self.static_val = kwargs.get('static_val', None)
         self.validators = kwargs.get('validators', [])
@@ -43,6 +52,16 @@ class Field(object):
         Field.creation_counter += 1
         self._init_validate()
 
+    def __get__(self, instance, owner):
+        """
+        Fields are non-data descriptors: cleaned values stored on the
+        instance take precedence, so only lazy instances reach this and
+        clean the field on first access.
+        """
+        if instance is None or '_raw_line' not in instance.__dict__:
+            return self
+        return instance._load_field(self)
+
     def to_python(self, value):
         """
         Converts the input value into the expected Python data type, raising
@@ -83,11 +102,10 @@ class Field(object):
         return None
 
     def _check_encoding(self, value):
+        if self.normalize and isinstance(value, six.text_type):
+            value = transliterate.to_ascii(value)
         if six.PY3 is False:
             value = value.encode('utf-8')
-        if self.normalize:
-            value = unicodedata.normalize('NFKD', value).encode(
-                'ascii', 'ignore')
         return value
 
     def value_to_string(self, obj):
@@ -99,6 +117,32 @@ class Field(object):
         strvalue = self._value_to_string(pyvalue)
         return self._check_encoding(strvalue)
 
+    def format_value(self, value):
+        """
+        Same as value_to_string() for a bare value instead of an object.
+        """
+        if self.static_val is not None:
+            value = self.static_val
+        elif value is None:
+            value = self.get_default()
+        return self._check_encoding(self._value_to_string(value))
+
+    def raw_value(self, value):
+        """
+        Returns the exact slice `value` is stored as, raising
+        ValidationError when it does not fit in the field.
+        """
+        raw = self._check_encoding(self._value_to_string(value))
+        # CharField truncates, which would match longer values by prefix.
+        too_long = (isinstance(value, six.string_types) and
+                    len(value.rstrip()) > self.size)
+        if len(raw) != self.size or too_long:
+            raise exceptions.ValidationError(
+                'Value %r of %s does not fit in %s characters.' % (
+                    value, self.name, self.size),
+                code='max_size')
+        return raw
+
     def _value_to_string(self, val):
         raise NotImplementedError('Need to implement value_to_string.')
 
@@ -109,13 +153,10 @@ class Field(object):
         """
         if self.size is None:
             msg = self.error_messages['invalid_size']
-            raise exceptions.ValidationError(msg)
+            raise exceptions.ValidationError(msg, code='invalid_size')
 
         if self.choices:
-            options = map(lambda x: x[0], self.choices)
-            if value not in options:
-                msg = self.error_messages['invalid_choice'] % value
-                raise exceptions.ValidationError(msg)
+            self.check_choice(value)
 
         str_value = self._value_to_string(value)
         if len(str_value) > self.size:
@@ -125,7 +166,24 @@ class Field(object):
                                              'formated size: %s' % (
                                                  self.size,
                                                  str_value,
-                                                 len(str_value)))
+                                                 len(str_value)),
+                                             code='max_size')
+
+    def check_choice(self, value):
+        """
+        Returns `value` if it is one of the choices, raising ValidationError
+        otherwise.
+        """
+        if value not in self.choice_values:
+            msg = self.error_messages['invalid_choice'] % value
+            raise exceptions.ValidationError(msg, code='invalid_choice')
+        return value
+
+    def get_display(self, value):
+        """
+        Returns the label of `value` in choices, or `value` itself.
+        """
+        return self.choice_labels.get(value, value)
 
     def clean(self, value, model_instance):
         """
@@ -154,7 +212,52 @@ class Field(object):
                 else:
                     errors.extend(e.messages)
         if errors:
-            raise exceptions.ValidationError(errors)
+            raise exceptions.ValidationError(errors, code='validators')
+
+    def parse_source(self, var, ref):
+        """
+        Returns the source of a Python expression that converts the raw
+        slice named `var` into the cleaned value, or None when the field
+        must go through clean(). `ref` is the name of the field itself in
+        the generated code. Used by fixedwidthtext.codegen.
+        """
+        return None
+
+    def parse_bytes_source(self, var, ref, encoding):
+        """
+        Same as parse_source() for a raw slice of bytes in the single byte
+        `encoding`, decoding only what needs to be decoded.
+        """
+        return None
+
+    def format_source(self, var, ref):
+        """
+        Returns the source of a Python expression that formats the value
+        named `var` into the fixed width string, or None when the field
+        must go through value_to_string(). `ref` is the name of the field
+        itself in the generated code. Used by fixedwidthtext.codegen.
+        """
+        return None
+
+    def _can_compile_parse(self, owner):
+        if self.validators:
+            return False
+        return self._inherits(owner, 'clean', 'validate', 'run_validators',
+                              'to_python', '_value_to_string', 'check_choice')
+
+    def _can_compile_format(self, owner):
+        if not six.PY3 or self.static_val is not None:
+            return False
+        return self._inherits(owner, 'value_to_string', 'format_value',
+                              '_get_val_from_obj', '_value_to_string',
+                              '_check_encoding')
+
+    def _inherits(self, owner, *names):
+        for name in names:
+            method = six.get_unbound_function(getattr(type(self), name))
+            if method is not six.get_unbound_function(getattr(owner, name)):
+                return False
+        return True
 
     def _get_val_from_obj(self, obj):
         if self.static_val is not None:
@@ -167,43 +270,152 @@ class Field(object):
                 return self.get_default()
 
 
-class DateField(Field):
-    default_error_messages = {
-        'invalid': "'%s' value has an invalid date format. It must be "
-        "in 'YYYYMMDD' formated string or instance of datetime.",
-        'invalid_date': "'%s' value has the correct format (YYYYMMDD) "
-        "but it is an invalid date."}
+class TemporalField(Field):
+    """
+    Base class for fields stored in a fixed digits format, such as
+    'DDMMYYYY'. The format is compiled once per field and conversions in
+    both directions are memoized in a bounded LRU cache, since files usually
+    repeat a handful of distinct dates and times.
+    """
+    default_format = None
+    # Key of error_messages for well formed but impossible values
+    invalid_value_message = None
+    # (token, component, strftime directive), longest tokens first
+    format_tokens = ()
+    required_components = ()
 
     def __init__(self, **kwargs):
-        kwargs['size'] = 8
-        super(DateField, self).__init__(**kwargs)
+        self.format = kwargs.get('format', self.default_format)
+        self._compile_format()
+        kwargs['size'] = len(self.format)
+        super(TemporalField, self).__init__(**kwargs)
+        cache_size = kwargs.get('cache_size', cache.DEFAULT_CACHE_SIZE)
+        self.parse_raw = cache.memoize(self._parse_raw, cache_size)
+        self.format_raw = cache.memoize(self._format_raw, cache_size)
+
+    def _compile_format(self):
+        slices = []
+        strftime = ''
+        index = 0
+        while index < len(self.format):
+            for token, component, directive in self.format_tokens:
+                if self.format.startswith(token, index):
+                    slices.append((component, index, index + len(token)))
+                    strftime += directive
+                    index += len(token)
+                    break
+            else:
+                strftime += self.format[index].replace('%', '%%')
+                index += 1
+        components = [component for component, start, end in slices]
+        for required in self.required_components:
+            if not [c for c in components if c.startswith(required)]:
+                raise exceptions.ValidationError(
+                    'Invalid format %r, missing %s.' % (self.format, required))
+        self.format_slices = tuple(slices)
+        self.strftime = strftime
+
+    def _parse_raw(self, value):
+        try:
+            parts = dict((component, int(value[start:end]))
+                         for component, start, end in self.format_slices)
+        except (TypeError, ValueError):
+            msg = self.error_messages['invalid'] % value
+            raise exceptions.ValidationError(msg, code='invalid')
+        try:
+            return self.build(parts)
+        except ValueError:
+            msg = self.error_messages[self.invalid_value_message] % value
+            raise exceptions.ValidationError(msg, code='invalid_value')
+
+    def _format_raw(self, value):
+        return self._check_encoding(value.strftime(self.strftime))
+
+    def build(self, parts):
+        """
+        Returns the Python value from a dict of the format components.
+        Subclasses should implement this.
+        """
+        raise NotImplementedError('Need to implement build.')
 
     def _value_to_string(self, value):
-        return self._check_encoding(value.strftime('%Y%m%d'))
+        return self.format_raw(value)
+
+    def _get_owner(self):
+        for klass in type(self).__mro__:
+            if 'build' in klass.__dict__:
+                return klass
+
+    def parse_bytes_source(self, var, ref, encoding):
+        return self.parse_source(var, ref)
+
+    def parse_source(self, var, ref):
+        if self._can_compile_parse(self._get_owner()):
+            return '%s.parse_raw(%s)' % (ref, var)
+
+    def format_source(self, var, ref):
+        if self._can_compile_format(self._get_owner()):
+            return '%s.format_raw(%s)' % (ref, var)
+
+
+class DateField(TemporalField):
+    """
+    Date stored as digits, 'YYYYMMDD' by default. Formats combine the
+    tokens YYYY, YY, MM and DD with any literal character, as in
+    'DDMMYYYY', 'YYMMDD' or 'DD/MM/YYYY'. Two digit years follow strptime:
+    69 to 99 are in the 1900s, 00 to 68 in the 2000s.
+    """
+    default_error_messages = {
+        'invalid': "'%s' value has an invalid date format. It must be "
+        "a string in the field format (YYYYMMDD by default) or instance "
+        "of datetime.",
+        'invalid_date': "'%s' value has the correct format but it is an "
+        "invalid date."}
+    invalid_value_message = 'invalid_date'
+    default_format = 'YYYYMMDD'
+    format_tokens = (
+        ('YYYY', 'year', '%Y'),
+        ('YY', 'year2', '%y'),
+        ('MM', 'month', '%m'),
+        ('DD', 'day', '%d'))
+    required_components = ('year', 'month', 'day')
+
+    def build(self, parts):
+        year = parts.get('year')
+        if year is None:
+            year = parts['year2']
+            year += 1900 if year >= 69 else 2000
+        return datetime.date(year, parts['month'], parts['day'])
 
     def to_python(self, value):
         if isinstance(value, datetime.datetime):
             return value.date()
         if isinstance(value, datetime.date):
             return value
-        try:
-            return datetime.date(
-                int(value[:4]), int(value[4:6]), int(value[6:]))
-        except Exception:
-            msg = self.error_messages['invalid'] % value
-            raise exceptions.ValidationError(msg)
+        return self.parse_raw(value)
 
 
-class TimeField(Field):
+class TimeField(TemporalField):
+    """
+    Time stored as digits, 'HHMM' by default. Formats combine the tokens
+    HH, MM and SS with any literal character, as in 'HHMMSS'.
+    """
     default_error_messages = {
-        'invalid': "'%s' value has an invalid format. It must be in "
-        "HH:MM[:ss[.uuuuuu]] format.",
-        'invalid_time': "'%s' value has the correct format "
-        "(HH:MM[:ss[.uuuuuu]]) but it is an invalid time."}
-
-    def __init__(self, **kwargs):
-        kwargs['size'] = 4
-        super(TimeField, self).__init__(**kwargs)
+        'invalid': "'%s' value has an invalid format. It must be a string "
+        "in the field format (HHMM by default) or instance of time.",
+        'invalid_time': "'%s' value has the correct format but it is an "
+        "invalid time."}
+    invalid_value_message = 'invalid_time'
+    default_format = 'HHMM'
+    format_tokens = (
+        ('HH', 'hour', '%H'),
+        ('MM', 'minute', '%M'),
+        ('SS', 'second', '%S'))
+    required_components = ('hour', 'minute')
+
+    def build(self, parts):
+        return datetime.time(
+            parts['hour'], parts['minute'], parts.get('second', 0))
 
     def to_python(self, value):
         if value is None:
@@ -212,41 +424,42 @@ class TimeField(Field):
             return value
         if isinstance(value, datetime.datetime):
             return value.time()
-        try:
-            if value is not None:
-                if len(value) is 4:
-                    parsed = datetime.time(int(value[:2]), int(value[2:]))
-                if len(value) is 6:
-                    parsed = datetime.time(
-                        int(value[:2]), int(value[2:4]), int(value[4:]))
-                return parsed
-        except ValueError:
-            msg = self.error_messages['invalid_time'] % value
-            raise exceptions.ValidationError(msg)
-
-    def _value_to_string(self, value):
-        return value.strftime("%H%M")
+        return self.parse_raw(value)
 
 
 class IntegerField(Field):
     default_error_messages = {
         'invalid': "'%s' value must be an integer or string."}
 
+    def __init__(self, **kwargs):
+        super(IntegerField, self).__init__(**kwargs)
+        self.mask = '%0' + str(self.size) + 'd'
+
     def _value_to_string(self, value):
-        mask = '%0' + str(self.size) + 'd'
-        return mask % int(value)
+        return self.mask % int(value)
+
+    def parse_bytes_source(self, var, ref, encoding):
+        return self.parse_source(var, ref)
+
+    def parse_source(self, var, ref):
+        if self._can_compile_parse(IntegerField):
+            return 'int(%s)' % var
+
+    def format_source(self, var, ref):
+        if self._can_compile_format(IntegerField):
+            return '%r %% int(%s)' % (self.mask, var)
 
     def to_python(self, value):
         if isinstance(value, int):
             return value
         if isinstance(value, six.string_types) is False:
             raise exceptions.ValidationError(
-                self.error_messages['invalid'] % value)
+                self.error_messages['invalid'] % value, code='invalid')
         try:
             return int(value)
         except ValueError:
             msg = self.error_messages['invalid'] % value
-            raise exceptions.ValidationError(msg)
+            raise exceptions.ValidationError(msg, code='invalid')
 
 
 class CharField(Field):
@@ -259,12 +472,24 @@ class CharField(Field):
             return value + ' ' * (self.size - current_size)
         return value[:self.size]
 
+    def parse_source(self, var, ref):
+        if self._can_compile_parse(CharField):
+            return '%s.strip()' % var
+
+    def parse_bytes_source(self, var, ref, encoding):
+        if self._can_compile_parse(CharField):
+            return '%s.decode(%r).strip()' % (var, encoding)
+
+    def format_source(self, var, ref):
+        if self._can_compile_format(CharField):
+            return '(%s + %r)[:%d]' % (var, ' ' * self.size, self.size)
+
     def to_python(self, value):
         if isinstance(value, int):
             value = str(value)
         if isinstance(value, six.string_types) is False:
             msg = self.error_messages['invalid'] % value
-            raise exceptions.ValidationError(msg)
+            raise exceptions.ValidationError(msg, code='invalid')
         return value.strip()
 
 
@@ -273,35 +498,88 @@ class StringField(CharField):
 
 
 class DecimalField(Field):
+    """
+    Stores a number as its digits scaled by 10 ** decimal_places, without
+    separator. Values are Decimal instances, or plain scaled integers (cents
+    for two places) when `as_integer` is True.
+    """
     default_error_messages = {
         'invalid': "'%s' value must be a decimal number."}
 
     def __init__(self, **kwargs):
         super(DecimalField, self).__init__(**kwargs)
         self.decimal_places = kwargs.get('decimal_places', None)
+        self.as_integer = kwargs.get('as_integer', False)
+        self.mask = '%0' + str(self.size) + 'd'
+
+    def _get_places(self):
+        if self.decimal_places is None:
+            return 2
+        return self.decimal_places
+
+    def scaled(self, value):
+        """
+        Returns `value` as an integer scaled by 10 ** decimal_places,
+        rounding half to even.
+        """
+        if isinstance(value, six.integer_types):
+            if self.as_integer:
+                return value
+            return value * 10 ** self._get_places()
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value))
+        return int(value.scaleb(self._get_places(), EXACT).to_integral_value(
+            context=EXACT))
 
     def _value_to_string(self, value):
         try:
-            value = decimal.Decimal(str(value))
-            value = str(value.quantize(decimal.Decimal('0.01')))
-            value = int(value.replace('.', '').replace(',', ''))
-            mask = '%0' + str(self.size) + 'd'
-            return mask % value
-        except:
+            return self.mask % self.scaled(value)
+        except Exception:
             msg = self.error_messages['invalid'] % value
-            raise exceptions.ValidationError(msg)
+            raise exceptions.ValidationError(msg, code='invalid')
 
     def to_python(self, value):
         if self.decimal_places is None:
             raise exceptions.ValidationError('Need to set decimal_places')
-        if value is None or isinstance(value, decimal.Decimal):
+        if value is None:
             return value
+        if self.as_integer:
+            return self._to_integer(value)
+        if isinstance(value, decimal.Decimal):
+            return value
+        if isinstance(value, six.integer_types):
+            return decimal.Decimal(value)
+        if isinstance(value, float):
+            return decimal.Decimal(str(value))
         try:
-            value = "%s.%s" % (
-                value[:-self.decimal_places],
-                value[-self.decimal_places:])
+            return decimal.Decimal(int(value)).scaleb(
+                -self.decimal_places, EXACT)
+        except (TypeError, ValueError):
+            msg = self.error_messages['invalid'] % value
+            raise exceptions.ValidationError(msg, code='invalid')
 
-            return decimal.Decimal(value)
-        except decimal.InvalidOperation:
+    def _to_integer(self, value):
+        if isinstance(value, six.integer_types):
+            return value
+        try:
+            if isinstance(value, (decimal.Decimal, float)):
+                return self.scaled(value)
+            return int(value)
+        except (TypeError, ValueError, ArithmeticError):
             msg = self.error_messages['invalid'] % value
-            raise exceptions.ValidationError(msg)
+            raise exceptions.ValidationError(msg, code='invalid')
+
+    def parse_source(self, var, ref):
+        if (self.decimal_places is not None and
+                self._can_compile_parse(DecimalField)):
+            if self.as_integer:
+                return 'int(%s)' % var
+            return 'decimal.Decimal(int(%s)).scaleb(-%d, EXACT)' % (
+                var, self.decimal_places)
+
+    def parse_bytes_source(self, var, ref, encoding):
+        return self.parse_source(var, ref)
+
+    def format_source(self, var, ref):
+        if self._can_compile_format(DecimalField):
+            return '%r %% %s.scaled(%s)' % (self.mask, ref, var)
@@ -0,0 +1,78 @@
+# coding: utf-8
+from collections import Counter
+
+from fixedwidthtext import exceptions, streams
+
+
+class FileLayout(object):
+    """
+    Reads files mixing several record types (header, details, trailer...)
+    by dispatching each line to the model registered for the code found in
+    line[start:end].
+    """
+    def __init__(self, start, end, models=None):
+        self.start = start
+        self.end = end
+        self.models = {}
+        self.counters = Counter()
+        for key, model in (models or {}).items():
+            self.register(key, model)
+
+    def register(self, key, model):
+        if len(key) != self.end - self.start:
+            raise exceptions.ValidationError(
+                'Key %r must have %s characters.' % (
+                    key, self.end - self.start))
+        self.models[key] = model
+
+    def get_model(self, line, encoding=None):
+        return self._model(self._key(line, encoding))
+
+    def _key(self, line, encoding=None):
+        key = line[self.start:self.end]
+        if isinstance(key, bytes):
+            key = key.decode(encoding or streams.DEFAULT_ENCODING)
+        return key
+
+    def _model(self, key):
+        try:
+            return self.models[key]
+        except KeyError:
+            raise exceptions.ValidationError(
+                'Unknown record type: %r' % key)
+
+    def parse_line(self, line, encoding=None):
+        """
+        Returns an instance of the model registered for the key of `line`,
+        str or bytes. Bytes are parsed by the model in its Meta.encoding,
+        unless `encoding` is given; only the key is decoded here.
+        """
+        line = streams.strip_terminator(line)
+        key = self._key(line, encoding)
+        model = self._model(key)
+        if (isinstance(line, bytes) and
+                encoding not in (None, model._meta.encoding)):
+            line = line.decode(encoding)
+        record = model(string=line)
+        self.counters[key] += 1
+        return record
+
+    def iter_file(self, source, encoding=None,
+                  chunk_size=streams.DEFAULT_CHUNK_SIZE):
+        """
+        Lazily yields one instance per line of `source`, a path or a file
+        object, counting the records of each type in `counters`. Lines of
+        bytes are handed to each model as they are (see parse_line()).
+        """
+        self.counters = Counter()
+        fileobj, should_close = streams.open_source(source)
+        try:
+            for line_number, line in streams.iter_lines(fileobj, chunk_size):
+                try:
+                    yield self.parse_line(line, encoding)
+                except exceptions.ValidationError as e:
+                    raise exceptions.ValidationError(
+                        e.message, code=e.code, line_number=line_number)
+        finally:
+            if should_close:
+                fileobj.close()
@@ -0,0 +1,121 @@
+# coding: utf-8
+import io
+import mmap
+
+import six
+
+from fixedwidthtext import exceptions, streams
+
+
+class RecordView(object):
+    """
+    Lightweight view of one record of a MmapRecordFile. Fields are decoded
+    and cleaned when first accessed, then cached on the view.
+    """
+    def __init__(self, records, index, offset):
+        self._records = records
+        self._index = index
+        self._offset = offset
+
+    def __getattr__(self, name):
+        try:
+            start, end, field = self._records.offsets[name]
+        except KeyError:
+            raise AttributeError(name)
+        raw = self._records.read(self._offset + start, self._offset + end)
+        try:
+            value = field.clean(raw, self)
+        except exceptions.ValidationError as e:
+            raise exceptions.ValidationError(
+                '%s: %s' % (name, e.message), code=e.code,
+                line_number=self._index + 1)
+        self.__dict__[name] = value
+        return value
+
+    def to_string(self):
+        return self._records.read(
+            self._offset, self._offset + self._records.model._meta.total_size)
+
+    def to_model(self):
+        """
+        Returns a fully parsed and validated instance of the model.
+        """
+        return self._records.model(string=self.to_string())
+
+    def __repr__(self):
+        return '<%s view of record %s>' % (
+            self._records.model.__name__, self._index)
+
+
+class MmapRecordFile(object):
+    """
+    Memory maps a fixed width file and gives O(1) random access to its
+    records without reading the whole file:
+
+        with MmapRecordFile(Header, 'remessa.txt') as records:
+            len(records)
+            records[80000000].valor
+
+    A last record shorter than total_size raises ValidationError on open.
+    """
+    def __init__(self, model, path, encoding=None):
+        self.model = model
+        self.encoding = streams.byte_encoding(
+            model, encoding, 'MmapRecordFile')
+        self.offsets = model._meta.offsets
+        size = model._meta.total_size
+        self._fileobj = io.open(path, 'rb')
+        try:
+            terminator = streams.detect_terminator(self._fileobj, size)
+            self.stride = size + len(terminator)
+            length = self._fileobj.seek(0, io.SEEK_END)
+            self._length, tail = divmod(length, self.stride)
+            if tail >= size:
+                self._length += 1
+            elif tail:
+                raise exceptions.ValidationError(
+                    'String with wrong size, needed: %s, passed: %s' % (
+                        size, tail),
+                    code='size', line_number=self._length + 1)
+            if length:
+                self._mmap = mmap.mmap(
+                    self._fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            else:
+                self._mmap = self._view = None
+        except Exception:
+            self._fileobj.close()
+            raise
+
+    def read(self, start, end):
+        return self._view[start:end].tobytes().decode(self.encoding)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in six.moves.range(
+                *index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('record index out of range')
+        return RecordView(self, index, index * self.stride)
+
+    def __iter__(self):
+        for index in six.moves.range(self._length):
+            yield self[index]
+
+    def close(self):
+        if self._mmap is not None:
+            self._view.release()
+            self._mmap.close()
+            self._mmap = self._view = None
+        self._fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,24 +1,47 @@
 # coding: utf-8
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+import functools
+import io
+import re
+
 import six
 
-from fixedwidthtext import exceptions
+from fixedwidthtext import codegen, exceptions, streams, transliterate
 from fixedwidthtext.fields import Field
 
 RESERVED_FIELD_NAMES = ['line']
 
 
 class Options(object):
-    def __init__(self, attrs):
+    def __init__(self, attrs, meta=None):
         self.fields = []
         self.total_size = 0
-        self.verbose_name = None
+        self.verbose_name = getattr(meta, 'verbose_name', None)
+        self.codegen = getattr(meta, 'codegen', True)
+        self.lazy = getattr(meta, 'lazy', False)
+        self.slots = getattr(meta, 'slots', False)
+        self.encoding = getattr(meta, 'encoding', streams.DEFAULT_ENCODING)
+        self.single_byte = streams.is_single_byte(self.encoding)
+        self.normalize = getattr(meta, 'normalize', False)
+        self.profile = None
+        self.parse_plan = ()
+        self.offsets = {}
+        self.record_class = None
+        self.projections = {}
         self._prepare(attrs)
 
     def _prepare(self, attrs):
         self._add_fields_names(attrs)
         self._populate_fields(attrs)
         self._compute_total_size()
+        self._compute_parse_plan()
+        if self.lazy:
+            self._check_lazy()
+
+    def _check_lazy(self):
+        if self.slots:
+            raise exceptions.ValidationError(
+                'Lazy mode is not available for models with slots.')
 
     def _compute_total_size(self):
         total = 0
@@ -26,6 +49,21 @@ class Options(object):
             total += field.size
         self.total_size = total
 
+    def _compute_parse_plan(self):
+        """
+        Precomputes a (name, start, end, field) tuple for each field so a
+        line can be sliced and cleaned in a single pass.
+        """
+        plan = []
+        start = 0
+        for name, field in self.fields.items():
+            end = start + field.size
+            plan.append((name, start, end, field))
+            start = end
+        self.parse_plan = tuple(plan)
+        self.offsets = dict(
+            (name, (start, end, field)) for name, start, end, field in plan)
+
     def _add_fields_names(self, attrs):
         for name, field in attrs.items():
             if isinstance(field, Field):
@@ -56,41 +94,178 @@ class ModelBase(type):
             return super_new(cls, name, bases, attrs)
 
         module = attrs.pop('__module__')
-        new_class = super_new(cls, name, bases, {'__module__': module})
+        meta = attrs.pop('Meta', None)
+        opts = Options(attrs, meta)
 
-        new_class.add_to_class('_meta', Options(attrs))
+        new_attrs = {'__module__': module}
+        slots = attrs.pop('__slots__', None)
+        if isinstance(slots, six.string_types):
+            slots = (slots,)
+        if slots is not None and opts.fields:
+            # Declaring __slots__ on a model with fields is the same as
+            # Meta.slots, plus the extra slots declared.
+            opts.slots = True
+            if opts.lazy:
+                opts._check_lazy()
+        if opts.slots:
+            # Fields are only reachable through _meta, their names are
+            # taken by the slot descriptors.
+            new_attrs['__slots__'] = tuple(opts.fields) + tuple(
+                slot for slot in slots or () if slot not in opts.fields)
+            for obj_name in opts.fields:
+                attrs.pop(obj_name)
+        elif slots is not None:
+            new_attrs['__slots__'] = slots
+        new_class = super_new(cls, name, bases, new_attrs)
+        new_class.add_to_class('_meta', opts)
+        opts.record_class = record_class(
+            new_class, '%sRecord' % name, list(opts.fields), _load_record)
 
         # Add all attributes to the class.
         for obj_name, obj in attrs.items():
             new_class.add_to_class(obj_name, obj)
+
+        for field_name, field in opts.fields.items():
+            if field.choices:
+                new_class.add_to_class(
+                    'get_%s_display' % field_name, _display_method(field))
+
+        if not opts.fields or not codegen.can_compile(opts):
+            opts.codegen = False
+        else:
+            new_class.add_to_class('_fast_parse', codegen.build_parse(opts))
+            new_class.add_to_class(
+                '_fast_to_string', codegen.build_to_string(opts))
+            new_class.add_to_class(
+                '_fast_format', staticmethod(codegen.build_format(opts)))
+            if opts.single_byte:
+                new_class.add_to_class(
+                    '_fast_parse_bytes', codegen.build_parse_bytes(opts))
         return new_class
 
     def add_to_class(cls, name, value):
         setattr(cls, name, value)
 
 
+def record_class(model, name, field_names, load, *args):
+    """
+    Returns a namedtuple class named `name`, in the module of `model`,
+    whose instances pickle as `load(model, *args, values)`, so records can
+    be sent to other processes and cached while the class itself is built
+    at runtime.
+    """
+    name = re.sub(r'\W', '_', name)
+    record = namedtuple(name, field_names, rename=True)
+    record.__module__ = model.__module__
+
+    def __reduce__(self):
+        return load, (model,) + args + (tuple(self),)
+    record.__reduce__ = __reduce__
+    return record
+
+
+def _load_record(model, values):
+    return model._meta.record_class._make(values)
+
+
+def _display_method(field):
+    def get_display(self):
+        return field.get_display(getattr(self, field.name))
+    get_display.__name__ = 'get_%s_display' % field.name
+    return get_display
+
+
 class LineManager(six.with_metaclass(ModelBase)):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         if 'string' in kwargs:
-            self._parse_and_populate(kwargs['string'].replace('\r', ''))
+            self._parse(kwargs['string'], kwargs.get('lazy', self._meta.lazy))
         else:
             self._populate_fields(kwargs)
-        self.clean_fields()
+            self.clean_fields()
+
+    def _parse(self, string, lazy=False):
+        if len(string) != self._meta.total_size:
+            string = streams.strip_terminator(string)
+        if six.PY3 and isinstance(string, bytes):
+            if self._meta.codegen and self._meta.single_byte and not lazy:
+                return self._fast_parse_bytes(string)
+            string = string.decode(self._meta.encoding)
+        if lazy:
+            self._meta._check_lazy()
+            self._validate_string(string)
+            self._raw_line = string
+        elif self._meta.codegen:
+            self._fast_parse(string)
+        else:
+            self._parse_and_clean(string)
+
+    def load(self, string, lazy=None):
+        """
+        Parses `string` into this instance, replacing its values, and
+        returns it. Reusing one instance per stream saves allocating an
+        object per line in read, modify and write pipelines. If the line is
+        invalid the instance is left with an undefined mix of values.
+        """
+        if lazy is None:
+            lazy = self._meta.lazy
+        values = getattr(self, '__dict__', None)
+        if values:
+            values.pop('_raw_line', None)
+            if lazy:
+                for name in self._meta.fields:
+                    values.pop(name, None)
+        self._parse(string, lazy)
+        return self
 
     def _populate_fields(self, dictionary):
         for name, field in self._meta.fields.items():
             setattr(self, name, dictionary.get(name, None))
 
-    def _parse_and_populate(self, string):
+    def _parse_and_clean(self, string):
         self._validate_string(string)
-        index = 0
-        dictionary = {}
-        for name, field in self._meta.fields.items():
-            ending = index + field.size
-            value = string[index:ending]
-            dictionary[name] = value
-            index = ending
-        self._populate_fields(dictionary)
+        errors = {}
+        for name, start, end, field in self._meta.parse_plan:
+            value = string[start:end]
+            try:
+                value = field.clean(value, self)
+            except Exception as e:
+                errors[name] = str(e)
+            setattr(self, name, value)
+        if errors:
+            raise exceptions.ValidationError(repr(errors))
+
+    def _load_field(self, field):
+        """
+        Cleans the raw slice of `field` on first access of a lazy instance.
+        """
+        start, end, field = self._meta.offsets[field.name]
+        try:
+            value = field.clean(self._raw_line[start:end], self)
+        except Exception as e:
+            raise exceptions.ValidationError(repr({field.name: str(e)}))
+        setattr(self, field.name, value)
+        return value
+
+    def full_clean(self):
+        """
+        Cleans every field not accessed yet on a lazy instance, raising a
+        single ValidationError with all the errors.
+        """
+        if '_raw_line' not in getattr(self, '__dict__', ()):
+            return
+        errors = {}
+        for name, start, end, field in self._meta.parse_plan:
+            if name in self.__dict__:
+                continue
+            try:
+                setattr(self, name, field.clean(
+                    self._raw_line[start:end], self))
+            except Exception as e:
+                errors[name] = str(e)
+        if errors:
+            raise exceptions.ValidationError(repr(errors))
 
     def _validate_string(self, string):
         string_length = len(string)
@@ -98,7 +273,7 @@ class LineManager(six.with_metaclass(ModelBase)):
             msg = 'String with wrong size, needed: %s, passed: %s' % (
                 self._meta.total_size,
                 string_length)
-            raise exceptions.ValidationError(msg)
+            raise exceptions.ValidationError(msg, code='size')
 
     def clean_fields(self):
         errors = {}
@@ -112,13 +287,334 @@ class LineManager(six.with_metaclass(ModelBase)):
             raise exceptions.ValidationError(repr(errors))
 
     def to_string(self):
-        string = ''
-        for field in self._meta.fields.values():
-            string += field.value_to_string(self)
+        if self._meta.codegen:
+            string = self._fast_to_string()
+        else:
+            string = ''.join([field.value_to_string(self)
+                              for field in self._meta.fields.values()])
+        if self._meta.normalize:
+            string = transliterate.transliterate(string)
+        if len(string) != self._meta.total_size:
+            self._check_widths([field.value_to_string(self)
+                                for field in self._meta.fields.values()])
         return string
 
+    def to_bytes(self):
+        """
+        Returns to_string() encoded once, for the whole line, in
+        Meta.encoding.
+        """
+        return self.to_string().encode(self._meta.encoding)
+
+    @classmethod
+    def _check_widths(cls, parts):
+        errors = {}
+        for field, part in zip(cls._meta.fields.values(), parts):
+            if cls._meta.normalize:
+                part = transliterate.to_ascii(part)
+            if len(part) != field.size:
+                errors[field.name] = (
+                    'Wrong formated size, size: %s, formated value: %s, '
+                    'formated size: %s' % (field.size, part, len(part)))
+        if errors:
+            raise exceptions.ValidationError(repr(errors), code='max_size')
+
+    @classmethod
+    def construct(cls, **kwargs):
+        """
+        Builds an instance from trusted, already validated values without
+        running clean_fields(). Widths are still checked by to_string().
+        """
+        instance = cls.__new__(cls)
+        instance._populate_fields(kwargs)
+        return instance
+
+    def to_record(self):
+        """
+        Returns the values as a namedtuple (_meta.record_class), a compact
+        representation for holding many records in memory.
+        """
+        return self._meta.record_class._make(
+            [getattr(self, name) for name in self._meta.fields])
+
     def get_dicts(self):
         dicts = []
         for field in self._meta.fields.values():
             dicts.append(field.to_dict(self))
         return dicts
+
+    @classmethod
+    def iter_file(cls, source, encoding=None,
+                  chunk_size=streams.DEFAULT_CHUNK_SIZE, newline=True,
+                  lazy=None, fields=None, where=None, reuse=False,
+                  start_record=None, start_offset=None):
+        """
+        Lazily yields one instance per record of `source`, a path or a file
+        object opened in binary or text mode. Records are split on newlines,
+        or by stride (`_meta.total_size` plus the terminator found after
+        the first record, if any) when `newline` is False, which requires a
+        single byte encoding for binary files. Bytes are parsed directly
+        when `encoding` is the single byte Meta.encoding (the default).
+        Validation errors carry the line number of the offending record.
+        `lazy` overrides Meta.lazy.
+
+        With `fields`, a list of field names, only those fields are sliced
+        and cleaned and namedtuples are yielded instead of instances (see
+        only()).
+
+        With `where`, a dict of conditions on fields (see
+        fixedwidthtext.predicates.Where), lines that do not match are
+        skipped by comparing raw slices, before anything is parsed.
+
+        With `reuse`, the same instance is loaded with each record (see
+        load()) and yielded again, so it must not be kept between
+        iterations; use to_record() or copy what is needed.
+
+        With `start_record` or `start_offset`, reading starts at that record
+        of a seekable binary file, by stride; see reader() to also follow
+        growing files and save checkpoints.
+        """
+        if start_record is not None or start_offset is not None:
+            return iter(cls.reader(
+                source, encoding=encoding, chunk_size=chunk_size, lazy=lazy,
+                fields=fields, where=where, reuse=reuse,
+                start_record=start_record, start_offset=start_offset))
+        parse = cls._get_parse(lazy, fields, reuse)
+        return cls._iter_parsed(
+            parse, source, encoding, chunk_size, newline, where)
+
+    @classmethod
+    def _get_parse(cls, lazy=None, fields=None, reuse=False):
+        if fields is not None:
+            return cls.only(*fields).parse
+        if lazy is None:
+            lazy = cls._meta.lazy
+        if reuse:
+            return functools.partial(cls.__new__(cls).load, lazy=lazy)
+        return functools.partial(cls, lazy=lazy)
+
+    @classmethod
+    def _iter_parsed(cls, parse, source, encoding, chunk_size, newline,
+                     where=None):
+        records = cls._iter_raw(source, encoding, chunk_size, newline)
+        return cls._parse_records(parse, records, where)
+
+    @classmethod
+    def _parse_records(cls, parse, records, where=None):
+        if cls._meta.profile is not None:
+            records = cls._meta.profile.files.count(records)
+        if where is not None:
+            records = cls.where(where).filter(records)
+        for line_number, record in records:
+            try:
+                yield parse(string=record)
+            except exceptions.ValidationError as e:
+                raise exceptions.ValidationError(
+                    e.message, code=e.code, line_number=line_number)
+
+    @classmethod
+    def _iter_raw(cls, source, encoding=None,
+                  chunk_size=streams.DEFAULT_CHUNK_SIZE, newline=True):
+        decode = encoding not in (None, cls._meta.encoding)
+        fileobj, should_close = streams.open_source(source)
+        try:
+            if newline:
+                records = streams.iter_lines(fileobj, chunk_size)
+            else:
+                if not isinstance(fileobj, io.TextIOBase):
+                    streams.byte_encoding(
+                        cls, encoding, 'iter_file(newline=False)')
+                records = streams.iter_stride(
+                    fileobj, cls._meta.total_size, chunk_size)
+            for line_number, record in records:
+                if decode and isinstance(record, bytes):
+                    record = record.decode(encoding)
+                yield line_number, record
+        finally:
+            if should_close:
+                fileobj.close()
+
+    @classmethod
+    def where(cls, conditions):
+        """
+        Returns a predicate telling whether a raw line matches
+        `conditions`, a dict of field name to value, values or callable.
+        """
+        from fixedwidthtext import predicates
+        if isinstance(conditions, predicates.Where):
+            return conditions
+        return predicates.Where(cls, conditions)
+
+    @classmethod
+    def reader(cls, source, **kwargs):
+        """
+        Returns a resumable RecordReader of `source`, which tracks the
+        index and byte offset of each record, starts at any record, saves
+        checkpoints and can follow a file that is still being written. See
+        fixedwidthtext.resumable.RecordReader.
+        """
+        from fixedwidthtext import resumable
+        return resumable.RecordReader(cls, source, **kwargs)
+
+    @classmethod
+    def profile(cls):
+        """
+        Returns a Profile collecting per-field and per-phase call counts,
+        times and errors of this model while it is active, plus the
+        throughput of iter_file(). See fixedwidthtext.profiling.
+        """
+        from fixedwidthtext import profiling
+        return profiling.Profile(cls)
+
+    @classmethod
+    def only(cls, *names):
+        """
+        Returns a Projection that parses only the fields `names` into
+        namedtuples, skipping every other field entirely. Projections are
+        built once per set of names.
+        """
+        from fixedwidthtext import projection
+        try:
+            return cls._meta.projections[names]
+        except KeyError:
+            result = projection.Projection(cls, names)
+        cls._meta.projections[names] = result
+        return result
+
+    @classmethod
+    def aiter_stream(cls, reader, **kwargs):
+        """
+        Asynchronous iterator of instances read from an asyncio.StreamReader
+        like `reader`: `async for record in Model.aiter_stream(reader)`.
+        See fixedwidthtext.aio.RecordStream.
+        """
+        from fixedwidthtext import aio
+        return aio.RecordStream(cls, reader, **kwargs)
+
+    @classmethod
+    def awrite_many(cls, records, writer, **kwargs):
+        """
+        Coroutine writing `records` to an asyncio.StreamWriter like
+        `writer`. See fixedwidthtext.aio.write_many.
+        """
+        from fixedwidthtext import aio
+        return aio.write_many(cls, records, writer, **kwargs)
+
+    @classmethod
+    def validate_lines(cls, lines, **kwargs):
+        """
+        Parses many lines and returns a structured ValidationReport instead
+        of raising. See fixedwidthtext.validation.validate_lines.
+        """
+        from fixedwidthtext import validation
+        return validation.validate_lines(cls, lines, **kwargs)
+
+    @classmethod
+    def validate_file(cls, source, **kwargs):
+        """
+        Same as validate_lines() for every line of `source`. See
+        fixedwidthtext.validation.validate_file.
+        """
+        from fixedwidthtext import validation
+        return validation.validate_file(cls, source, **kwargs)
+
+    @classmethod
+    def parse_file_parallel(cls, path, workers=None, batch_records=None,
+                            ordered=True, encoding=None):
+        """
+        Parses the file at `path` in a process pool and yields batches
+        (lists) of instances. See fixedwidthtext.parallel.iter_batches.
+        """
+        from fixedwidthtext import parallel
+        return parallel.iter_batches(
+            cls, path, workers=workers,
+            batch_records=batch_records or parallel.DEFAULT_BATCH_RECORDS,
+            ordered=ordered, encoding=encoding)
+
+    @classmethod
+    def read_columns(cls, source, encoding=None, as_dataframe=False):
+        """
+        Decodes `source` into one NumPy array per field. See
+        fixedwidthtext.columns.read_columns.
+        """
+        from fixedwidthtext import columns
+        return columns.read_columns(
+            cls, source, encoding=encoding, as_dataframe=as_dataframe)
+
+    @classmethod
+    def write_columns(cls, columns, target, line_terminator='\r\n',
+                      encoding=None):
+        """
+        Writes columns of values, keyed by field name, straight into one
+        preallocated buffer and returns the number of lines written. See
+        fixedwidthtext.columns.format_columns.
+        """
+        from fixedwidthtext import columns as columns_module
+        return columns_module.write_columns(
+            cls, columns, target, line_terminator, encoding)
+
+    @classmethod
+    def write_many(cls, records, target, line_terminator='\r\n',
+                   encoding=None, validate=True,
+                   buffer_lines=streams.DEFAULT_BUFFER_LINES):
+        """
+        Writes `records` to `target`, a path or a file object, one line per
+        record, and returns the number of lines written. Records may be
+        instances, which are already validated and only serialized, or
+        dicts and tuples of values in field order, which are cleaned through
+        an instance unless `validate` is False. Lines are encoded in
+        `encoding`, by default Meta.encoding, one block at a time.
+        """
+        fileobj, should_close = streams.open_source(target, 'wb')
+        writer = streams.LineWriter(
+            fileobj, line_terminator, encoding or cls._meta.encoding,
+            buffer_lines)
+        try:
+            for record in records:
+                writer.write(cls._record_to_string(record, validate))
+            writer.flush()
+        finally:
+            if should_close:
+                fileobj.close()
+        return writer.count
+
+    @classmethod
+    def _record_to_string(cls, record, validate=True):
+        if isinstance(record, LineManager):
+            return record.to_string()
+        if validate:
+            return cls._from_values(record).to_string()
+        return cls.format_row(record)
+
+    @classmethod
+    def _from_values(cls, values):
+        if isinstance(values, dict):
+            return cls(**values)
+        return cls(**dict(zip(cls._meta.fields, values)))
+
+    @classmethod
+    def format_row(cls, values):
+        """
+        Formats a dict or a sequence of values in field order straight into
+        a line, for trusted data: each value is formatted exactly once,
+        without to_python() or validators, and only the width of the
+        formatted output is checked.
+        """
+        if isinstance(values, dict):
+            values = [values.get(name) for name in cls._meta.fields]
+        elif len(values) != len(cls._meta.fields):
+            raise exceptions.ValidationError(
+                'Wrong number of values, needed: %s, passed: %s' % (
+                    len(cls._meta.fields), len(values)))
+        model_fields = cls._meta.fields.values()
+        if cls._meta.codegen:
+            string = cls._fast_format(values)
+        else:
+            string = ''.join([field.format_value(value)
+                              for field, value in zip(model_fields, values)])
+        if cls._meta.normalize:
+            string = transliterate.transliterate(string)
+        if len(string) != cls._meta.total_size:
+            cls._check_widths([field.format_value(value)
+                               for field, value in zip(model_fields, values)])
+        return string
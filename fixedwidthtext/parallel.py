@@ -0,0 +1,76 @@
+# coding: utf-8
+"""
+Parses fixed stride files across processes. Since every record has
+`_meta.total_size` characters plus the same terminator, the file is split in
+byte ranges at exact record boundaries without scanning it.
+"""
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, wait)
+
+from fixedwidthtext import exceptions, streams
+
+DEFAULT_BATCH_RECORDS = 10000
+
+
+def _parse_range(model, path, encoding, first, count, stride, size):
+    records = []
+    errors = []
+    with io.open(path, 'rb') as fileobj:
+        fileobj.seek(first * stride)
+        data = fileobj.read(count * stride)
+    for index, start in enumerate(range(0, len(data), stride)):
+        record = data[start:start + size].decode(encoding)
+        try:
+            # Parse eagerly, so the work and its errors stay in the worker.
+            records.append(model(string=record, lazy=False))
+        except exceptions.ValidationError as e:
+            errors.append((first + index + 1, str(e)))
+    return records, errors
+
+
+def iter_batches(model, path, workers=None,
+                 batch_records=DEFAULT_BATCH_RECORDS, ordered=True,
+                 encoding=None):
+    """
+    Yields lists of instances parsed by a pool of `workers` processes, in
+    file order unless `ordered` is False. Invalid records are skipped and,
+    once every batch was yielded, reported together in a ValidationError
+    whose message maps absolute line numbers to errors. `model` must be
+    importable by the workers (defined at module level). `encoding`
+    defaults to Meta.encoding and must be single byte.
+    """
+    encoding = streams.byte_encoding(model, encoding, 'parse_file_parallel')
+    size = model._meta.total_size
+    with io.open(path, 'rb') as fileobj:
+        stride = size + len(streams.detect_terminator(fileobj, size))
+    # A last record cut short is parsed too, so its error is reported.
+    total = -(-os.path.getsize(path) // stride)
+    ranges = [(first, min(batch_records, total - first))
+              for first in range(0, total, batch_records)]
+    workers = workers or multiprocessing.cpu_count()
+    max_pending = 2 * workers
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        ranges = deque(ranges)
+        while ranges or pending:
+            while ranges and len(pending) < max_pending:
+                first, count = ranges.popleft()
+                pending.append(executor.submit(
+                    _parse_range, model, path, encoding, first, count,
+                    stride, size))
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            records, batch_errors = future.result()
+            errors.update(batch_errors)
+            yield records
+    if errors:
+        raise exceptions.ValidationError(errors)
@@ -0,0 +1,78 @@
+# coding: utf-8
+import six
+
+from fixedwidthtext import codegen, exceptions
+
+COLLECTIONS = (list, tuple, set, frozenset)
+
+
+class Where(object):
+    """
+    Filters lines by comparing raw slices, before any field is converted
+    or validated, so a line that does not match costs a slice and a
+    comparison per condition:
+
+        Detalhe.iter_file('remessa.txt', where={
+            'tipo': '3', 'banco': (341, 237),
+            'valor': lambda raw: raw != b'0' * 13})
+
+    Each condition maps a field name to a value, which is formatted the
+    way the field writes it and compared with the slice, a list, tuple or
+    set of values, or a callable that receives the raw slice (bytes when
+    the file is read as bytes) and returns whether the line matches.
+    """
+    def __init__(self, model, conditions):
+        meta = model._meta
+        unknown = [name for name in conditions if name not in meta.fields]
+        if unknown:
+            raise exceptions.ValidationError(
+                'Unknown fields for %s: %s' % (
+                    model.__name__, ', '.join(sorted(unknown))),
+                code='invalid_field')
+        self.model = model
+        self.conditions = dict(conditions)
+        terms = []
+        bytes_terms = []
+        for name, start, end, field in meta.parse_plan:
+            if name not in self.conditions:
+                continue
+            condition = self.conditions[name]
+            if callable(condition):
+                terms.append((start, end, 'call', condition))
+                bytes_terms.append((start, end, 'call', condition))
+            elif isinstance(condition, COLLECTIONS):
+                raw = frozenset(field.raw_value(v) for v in condition)
+                terms.append((start, end, 'in', raw))
+                bytes_terms.append((start, end, 'in', frozenset(
+                    _encode(v, meta.encoding) for v in raw)))
+            else:
+                raw = field.raw_value(condition)
+                terms.append((start, end, '==', raw))
+                bytes_terms.append(
+                    (start, end, '==', _encode(raw, meta.encoding)))
+        self._match_str = codegen.build_where(terms)
+        self._match_bytes = codegen.build_where(bytes_terms)
+
+    def __call__(self, line):
+        if six.PY3 and isinstance(line, bytes):
+            return self._match_bytes(line)
+        return self._match_str(line)
+
+    def filter(self, records):
+        """
+        Yields the (line_number, line) pairs of `records` that match.
+        """
+        match_str = self._match_str
+        match_bytes = self._match_bytes
+        for line_number, line in records:
+            if isinstance(line, bytes):
+                if match_bytes(line):
+                    yield line_number, line
+            elif match_str(line):
+                yield line_number, line
+
+
+def _encode(value, encoding):
+    if isinstance(value, bytes):
+        return value
+    return value.encode(encoding)
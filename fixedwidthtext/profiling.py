@@ -0,0 +1,176 @@
+# coding: utf-8
+"""
+Opt-in instrumentation of a model. Nothing is wrapped until a profile is
+started, so models that are not being profiled run exactly the same code:
+
+    with Detalhe.profile() as profile:
+        for registro in Detalhe.iter_file('remessa.txt'):
+            ...
+    profile.as_dict()
+
+While a profile is active the generated parse and to_string functions are
+turned off, so every field goes through clean() and value_to_string() and
+can be timed on its own.
+"""
+import functools
+import time
+
+from fixedwidthtext import exceptions
+
+try:
+    clock = time.perf_counter
+except AttributeError:  # Python 2
+    clock = time.time
+
+FIELD_PHASES = ('clean', 'to_python', 'validate', 'run_validators',
+                'value_to_string', 'format_value')
+MODEL_PHASES = ('_parse', 'clean_fields', 'to_string', 'format_row')
+
+
+class Timer(object):
+    """
+    Call count, cumulative time in seconds and error count of a phase.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.time = 0.0
+        self.errors = 0
+
+    def wrap(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self.calls += 1
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                self.time += clock() - start
+        return wrapper
+
+    def as_dict(self):
+        return {'calls': self.calls, 'time': self.time,
+                'errors': self.errors}
+
+
+class FileCounter(object):
+    """
+    Records, bytes and elapsed time of the files read by the streaming
+    APIs.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.files = 0
+        self.records = 0
+        self.bytes = 0
+        self.time = 0.0
+
+    def count(self, records):
+        self.files += 1
+        start = clock()
+        try:
+            for line_number, record in records:
+                self.records += 1
+                self.bytes += len(record)
+                yield line_number, record
+        finally:
+            self.time += clock() - start
+
+    def as_dict(self):
+        return {
+            'files': self.files, 'records': self.records,
+            'bytes': self.bytes, 'time': self.time,
+            'records_per_second': (
+                self.records / self.time if self.time else 0.0)}
+
+
+class Profile(object):
+    """
+    Collects per-field and per-phase counters of `model` between start()
+    and stop(), or inside a with block.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.active = False
+        self.phases = dict((name, Timer()) for name in MODEL_PHASES)
+        self.fields = dict(
+            (name, dict((phase, Timer()) for phase in FIELD_PHASES))
+            for name in model._meta.fields)
+        self.files = FileCounter()
+
+    def reset(self):
+        for timer in self.phases.values():
+            timer.reset()
+        for phases in self.fields.values():
+            for timer in phases.values():
+                timer.reset()
+        self.files.reset()
+
+    def start(self):
+        meta = self.model._meta
+        if meta.profile is not None:
+            raise exceptions.ValidationError(
+                '%s is already being profiled.' % self.model.__name__)
+        self._codegen = meta.codegen
+        self._model_methods = {}
+        meta.codegen = False
+        meta.profile = self
+        for name, timer in self.phases.items():
+            self._model_methods[name] = self.model.__dict__.get(name)
+            method = getattr(self.model, name)
+            if getattr(method, '__self__', None) is self.model:
+                wrapped = classmethod(timer.wrap(method.__func__))
+            else:
+                wrapped = timer.wrap(method)
+            setattr(self.model, name, wrapped)
+        self._field_methods = []
+        for name, field in meta.fields.items():
+            for phase, timer in self.fields[name].items():
+                self._field_methods.append(
+                    (field, phase, field.__dict__.get(phase)))
+                setattr(field, phase, timer.wrap(getattr(field, phase)))
+        self.active = True
+        return self
+
+    def stop(self):
+        if not self.active:
+            return
+        meta = self.model._meta
+        for name, method in self._model_methods.items():
+            if method is None:
+                delattr(self.model, name)
+            else:
+                setattr(self.model, name, method)
+        for field, phase, method in self._field_methods:
+            if method is None:
+                del field.__dict__[phase]
+            else:
+                setattr(field, phase, method)
+        meta.codegen = self._codegen
+        meta.profile = None
+        self.active = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def as_dict(self):
+        return {
+            'model': self.model.__name__,
+            'phases': dict(
+                (name, timer.as_dict())
+                for name, timer in self.phases.items()),
+            'fields': dict(
+                (name, dict((phase, timer.as_dict())
+                            for phase, timer in phases.items()))
+                for name, phases in self.fields.items()),
+            'files': self.files.as_dict()}
@@ -0,0 +1,97 @@
+# coding: utf-8
+import six
+
+from fixedwidthtext import codegen, exceptions, models, streams
+
+
+class Projection(object):
+    """
+    Parses only some of the fields of a model, skipping the slicing,
+    conversion and validation of every other field:
+
+        for account, amount in Detalhe.only('account', 'amount').iter_file(
+                'remessa.txt'):
+            ...
+
+    Records are namedtuples with just the selected fields, in the order
+    they were given. The slices are computed once, from `_meta.offsets`.
+    """
+    def __init__(self, model, names):
+        meta = model._meta
+        if not names:
+            raise exceptions.ValidationError(
+                'At least one field is needed.', code='invalid_field')
+        unknown = [name for name in names if name not in meta.fields]
+        if unknown:
+            raise exceptions.ValidationError(
+                'Unknown fields for %s: %s' % (
+                    model.__name__, ', '.join(unknown)),
+                code='invalid_field')
+        self.model = model
+        self.names = tuple(names)
+        self.record_class = models.record_class(
+            model, '%s_%sRecord' % (model.__name__, '_'.join(self.names)),
+            self.names, _load_record, self.names)
+        self.plan = tuple(
+            (name,) + meta.offsets[name] for name in self.names)
+        self._parse_str = self._parse_generic
+        self._parse_bytes = None
+        if meta.codegen:
+            self._parse_str = codegen.build_projection(
+                meta, self.names, self._parse_generic, self.record_class)
+            if meta.single_byte:
+                self._parse_bytes = codegen.build_projection(
+                    meta, self.names, self._parse_generic,
+                    self.record_class, meta.encoding)
+
+    def __repr__(self):
+        return '<Projection %s(%s)>' % (
+            self.model.__name__, ', '.join(self.names))
+
+    def parse(self, string):
+        """
+        Returns the selected fields of the line `string`, str or bytes in
+        Meta.encoding, as a record. Raises ValidationError for a line of
+        the wrong size or invalid values in the selected fields only.
+        """
+        meta = self.model._meta
+        if len(string) != meta.total_size:
+            string = streams.strip_terminator(string)
+        if six.PY3 and isinstance(string, bytes):
+            if self._parse_bytes is not None:
+                return self._parse_bytes(string)
+            string = string.decode(meta.encoding)
+        return self._parse_str(string)
+
+    def _parse_generic(self, string):
+        total_size = self.model._meta.total_size
+        if len(string) != total_size:
+            raise exceptions.ValidationError(
+                'String with wrong size, needed: %s, passed: %s' % (
+                    total_size, len(string)),
+                code='size')
+        errors = {}
+        values = []
+        for name, start, end, field in self.plan:
+            value = string[start:end]
+            try:
+                value = field.clean(value, None)
+            except Exception as e:
+                errors[name] = str(e)
+            values.append(value)
+        if errors:
+            raise exceptions.ValidationError(repr(errors))
+        return self.record_class._make(values)
+
+    def iter_file(self, source, encoding=None,
+                  chunk_size=streams.DEFAULT_CHUNK_SIZE, newline=True,
+                  where=None):
+        """
+        Same as the model's iter_file(), yielding projected records.
+        """
+        return self.model._iter_parsed(
+            self.parse, source, encoding, chunk_size, newline, where)
+
+
+def _load_record(model, names, values):
+    return model.only(*names).record_class._make(values)
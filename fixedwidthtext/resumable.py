@@ -0,0 +1,206 @@
+# coding: utf-8
+"""
+Resumable reading of fixed width files. Every record takes exactly
+`_meta.total_size` bytes plus the line terminator, so the byte offset of a
+record is its index times that stride and a job can seek straight to where
+it stopped:
+
+    reader = Detalhe.reader('remessa.txt', checkpoint='remessa.ckpt',
+                            checkpoint_every=100000)
+    for registro in reader:
+        ...
+
+After a crash, the same code starts again from the last checkpoint instead
+of reparsing the whole file.
+"""
+import io
+import json
+import os
+import time
+
+from fixedwidthtext import exceptions, streams
+
+DEFAULT_CHECKPOINT_EVERY = 100000
+DEFAULT_POLL_INTERVAL = 1.0
+
+replace = getattr(os, 'replace', os.rename)
+
+
+class RecordReader(object):
+    """
+    Iterates the records of a seekable binary file, by stride, exposing the
+    index (`record_index`, from 0) and byte offset (`offset`) of the last
+    record read.
+
+    Reading starts at `start_record` or `start_offset`, or else at the
+    record saved in the `checkpoint` file, if it exists. Checkpoints hold
+    the index of the next record to process and are saved every
+    `checkpoint_every` records and when the file has been read entirely; a
+    record counts as processed once the next one is requested, so no record
+    is lost when a job stops in the middle of one. save_checkpoint() saves
+    the position after the last record read at any time.
+
+    With `follow`, reaching the end of the file waits `poll_interval`
+    seconds for more records to be appended instead of stopping, as in
+    `tail -f`, until `idle_timeout` seconds pass without new records (never
+    by default). Incomplete records are only parsed once fully written.
+
+    `encoding`, `chunk_size`, `lazy`, `fields`, `where` and `reuse` are the
+    same as in LineManager.iter_file(); `encoding` must be single byte.
+    Iterating the reader again starts over from `start_record`,
+    `start_offset` or the checkpoint.
+    """
+    def __init__(self, model, source, encoding=None,
+                 chunk_size=streams.DEFAULT_CHUNK_SIZE, lazy=None,
+                 fields=None, where=None, reuse=False, start_record=None,
+                 start_offset=None, checkpoint=None,
+                 checkpoint_every=DEFAULT_CHECKPOINT_EVERY, follow=False,
+                 poll_interval=DEFAULT_POLL_INTERVAL, idle_timeout=None):
+        self.model = model
+        self.encoding = streams.byte_encoding(model, encoding, 'RecordReader')
+        self.source = source
+        self._open()
+        self.chunk_size = chunk_size
+        self.parse = model._get_parse(lazy, fields, reuse)
+        self.where = where
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.stride = None
+        self.start_record = start_record
+        self.start_offset = start_offset
+        self.record_index = None
+        self.offset = None
+        self._saved = None
+
+    def __iter__(self):
+        return self.model._parse_records(
+            self.parse, self._iter_raw(), self.where)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self):
+        self.fileobj, self.should_close = streams.open_source(self.source)
+        if (isinstance(self.fileobj, io.TextIOBase) or
+                not self.fileobj.seekable()):
+            raise exceptions.ValidationError(
+                'Resumable reading needs a seekable binary file.')
+
+    def close(self):
+        if self.should_close:
+            self.fileobj.close()
+
+    def _read(self, size, wanted=None):
+        """
+        Reads up to `size` bytes. In follow mode, waits for the file to grow
+        until `wanted` bytes (all of them by default) were read or
+        `idle_timeout` passes.
+        """
+        wanted = size if wanted is None else wanted
+        data = self.fileobj.read(size)
+        started = time.time()
+        while self.follow and len(data) < wanted:
+            if (self.idle_timeout is not None and
+                    time.time() - started >= self.idle_timeout):
+                break
+            time.sleep(self.poll_interval)
+            data += self.fileobj.read(size - len(data))
+        return data
+
+    def _detect_stride(self):
+        size = self.model._meta.total_size
+        self.fileobj.seek(0)
+        head = self._read(size + 2)
+        return size + len(streams._terminator_after(head, size))
+
+    def _start_record(self):
+        if self.start_offset is not None:
+            if self.start_offset % self.stride:
+                raise exceptions.ValidationError(
+                    'Offset %s is not at the start of a record of %s '
+                    'bytes.' % (self.start_offset, self.stride),
+                    code='invalid_offset')
+            return self.start_offset // self.stride
+        if self.start_record is not None:
+            return self.start_record
+        state = self.load_checkpoint()
+        if state is None:
+            return 0
+        if state['stride'] != self.stride:
+            raise exceptions.ValidationError(
+                'Checkpoint %s was saved for records of %s bytes, not %s.' % (
+                    self.checkpoint, state['stride'], self.stride))
+        return state['record']
+
+    def _iter_raw(self):
+        if self.fileobj.closed:
+            # Iterating again: reopen the path closed by the last pass.
+            self._open()
+        self.stride = self._detect_stride()
+        first = self._start_record()
+        self._saved = first
+        self.fileobj.seek(first * self.stride)
+        size = self.model._meta.total_size
+        splitter = streams.FixedSplitter(size, self.stride - size)
+        splitter.line_number = first
+        decode = self.encoding != self.model._meta.encoding
+        every = self.checkpoint_every
+        try:
+            for line_number, record in self._split(splitter):
+                index = line_number - 1
+                if self.checkpoint and index - self._saved >= every:
+                    self._save(index)
+                self.record_index = index
+                self.offset = index * self.stride
+                if decode:
+                    record = record.decode(self.encoding)
+                yield line_number, record
+            self.save_checkpoint()
+        finally:
+            self.close()
+
+    def _split(self, splitter):
+        while True:
+            chunk = self._read(self.chunk_size, 1)
+            if not chunk:
+                break
+            for record in splitter.feed(chunk):
+                yield record
+        if not self.follow:
+            for record in splitter.close():
+                yield record
+
+    def load_checkpoint(self):
+        """
+        Returns the saved checkpoint as a dict with the `record` to start
+        from, its `offset` and the `stride`, or None.
+        """
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return None
+        with io.open(self.checkpoint, 'r') as f:
+            return json.load(f)
+
+    def save_checkpoint(self):
+        """
+        Saves the position after the last record read, if any.
+        """
+        if self.record_index is not None:
+            self._save(self.record_index + 1)
+
+    def _save(self, record):
+        self._saved = record
+        if not self.checkpoint:
+            return
+        state = {'record': record, 'offset': record * self.stride,
+                 'stride': self.stride}
+        temporary = self.checkpoint + '.tmp'
+        with io.open(temporary, 'w') as f:
+            f.write(u'%s' % json.dumps(state))
+        # A crash while saving keeps the previous checkpoint.
+        replace(temporary, self.checkpoint)
@@ -0,0 +1,221 @@
+# coding: utf-8
+import io
+import itertools
+import os
+
+import six
+
+from fixedwidthtext import exceptions
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_ENCODING = 'latin-1'
+DEFAULT_BUFFER_LINES = 10000
+
+
+def open_source(source, mode='rb'):
+    """
+    Returns a (fileobj, should_close) tuple for a path (str or path-like
+    object) or an already opened file object, anything with read() or
+    write().
+    """
+    if hasattr(source, 'read') or hasattr(source, 'write'):
+        return source, False
+    fspath = getattr(os, 'fspath', None)
+    if fspath is not None:
+        source = fspath(source)
+    return io.open(source, mode), True
+
+
+def detect_terminator(fileobj, record_size):
+    """
+    Returns the line terminator used after the first record of a binary
+    file object (b'\r\n', b'\n' or b'') and rewinds it.
+    """
+    position = fileobj.tell()
+    head = fileobj.read(record_size + 2)
+    fileobj.seek(position)
+    return _terminator_after(head, record_size)
+
+
+def _terminator_after(head, record_size):
+    lf, cr = _terminators(head)
+    if head[record_size:record_size + 2] == cr + lf:
+        return cr + lf
+    if head[record_size:record_size + 1] == lf:
+        return lf
+    return head[:0]
+
+
+def iter_chunks(fileobj, chunk_size=DEFAULT_CHUNK_SIZE):
+    read = fileobj.read
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class LineSplitter(object):
+    """
+    Push based newline splitter: feed() chunks and get back the
+    (line_number, record) pairs they complete. Trailing '\r' is removed and
+    blank lines are skipped, but still counted.
+    """
+    def __init__(self):
+        self.pending = None
+        self.line_number = 0
+
+    def feed(self, chunk):
+        if self.pending is None:
+            self.newline, self.cr = _terminators(chunk)
+            self.pending = chunk[:0]
+        lines = (self.pending + chunk).split(self.newline)
+        self.pending = lines.pop()
+        records = []
+        cr = self.cr
+        for line in lines:
+            self.line_number += 1
+            if line[-1:] == cr:
+                line = line[:-1]
+            if line:
+                records.append((self.line_number, line))
+        return records
+
+    def close(self):
+        pending = self.pending
+        self.pending = None
+        if pending and pending[-1:] == self.cr:
+            pending = pending[:-1]
+        if pending:
+            self.line_number += 1
+            return [(self.line_number, pending)]
+        return []
+
+
+def iter_lines(fileobj, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields (line_number, record) splitting the stream on newlines. Trailing
+    '\r' is removed and blank lines are skipped, but still counted.
+    """
+    splitter = LineSplitter()
+    for chunk in iter_chunks(fileobj, chunk_size):
+        for record in splitter.feed(chunk):
+            yield record
+    for record in splitter.close():
+        yield record
+
+
+class FixedSplitter(object):
+    """
+    Push based splitter cutting records of `size` characters and skipping
+    the `skip` characters of terminator after each one.
+    """
+    def __init__(self, size, skip=0):
+        self.size = size
+        self.stride = size + skip
+        self.pending = None
+        self.line_number = 0
+
+    def feed(self, chunk):
+        if self.pending:
+            chunk = self.pending + chunk
+        end = len(chunk) - len(chunk) % self.stride
+        records = []
+        for start in six.moves.range(0, end, self.stride):
+            self.line_number += 1
+            records.append(
+                (self.line_number, chunk[start:start + self.size]))
+        self.pending = chunk[end:]
+        return records
+
+    def close(self):
+        pending, self.pending = self.pending, None
+        if pending:
+            self.line_number += 1
+            return [(self.line_number, pending[:self.size])]
+        return []
+
+
+def iter_stride(fileobj, size, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields (line_number, record) cutting the stream every `size` characters
+    and skipping the line terminator found after the first record, so CR/LF
+    never have to be removed from the records. The first record is read
+    ahead, so text and unseekable streams work too.
+    """
+    head = fileobj.read(size + 2)
+    skip = len(_terminator_after(head, size))
+    stride = size + skip
+    splitter = FixedSplitter(size, skip)
+    chunks = iter_chunks(
+        fileobj, max(stride, chunk_size - chunk_size % stride))
+    for chunk in itertools.chain([head], chunks):
+        for record in splitter.feed(chunk):
+            yield record
+    for record in splitter.close():
+        yield record
+
+
+def strip_terminator(string):
+    if isinstance(string, bytes):
+        return string.rstrip(b'\r\n')
+    return string.rstrip(u'\r\n')
+
+
+def is_single_byte(encoding):
+    """
+    Whether every character of `encoding` takes exactly one byte, so byte
+    offsets are character offsets.
+    """
+    sample = u'\xe9\u20ac\u4e00'
+    return len(sample.encode(encoding, 'replace')) == len(sample)
+
+
+def byte_encoding(model, encoding, name):
+    """
+    Returns `encoding`, or the Meta.encoding of `model` if None, for `name`
+    to slice records by byte offsets. Multi-byte encodings are rejected.
+    """
+    encoding = encoding or model._meta.encoding
+    if not is_single_byte(encoding):
+        raise exceptions.ValidationError(
+            '%s requires a single byte encoding, not %s.' % (name, encoding))
+    return encoding
+
+
+def _terminators(chunk):
+    if isinstance(chunk, bytes):
+        return b'\n', b'\r'
+    return u'\n', u'\r'
+
+
+class LineWriter(object):
+    """
+    Buffers lines and writes them to `fileobj` in blocks of `buffer_lines`,
+    encoding each block at once unless the file object is in text mode.
+    """
+    def __init__(self, fileobj, line_terminator='\r\n',
+                 encoding=DEFAULT_ENCODING, buffer_lines=DEFAULT_BUFFER_LINES):
+        self.fileobj = fileobj
+        self.line_terminator = line_terminator
+        self.encoding = encoding
+        self.buffer_lines = buffer_lines
+        self.text = isinstance(fileobj, io.TextIOBase)
+        self.count = 0
+        self._buffer = []
+
+    def write(self, line):
+        self._buffer.append(line)
+        if len(self._buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        terminator = self.line_terminator
+        block = terminator.join(self._buffer) + terminator
+        if not self.text:
+            block = block.encode(self.encoding)
+        self.fileobj.write(block)
+        self.count += len(self._buffer)
+        self._buffer = []
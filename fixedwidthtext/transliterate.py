@@ -0,0 +1,52 @@
+# coding: utf-8
+"""
+Transliteration of text to ASCII for fields and models with normalize.
+The result is the same as unicodedata's NFKD decomposition with the non
+ASCII characters dropped, but the Latin-1 range, which covers the names
+and addresses found in payment files, is a precomputed str.translate()
+table and repeated values are cached.
+"""
+import unicodedata
+
+import six
+
+from fixedwidthtext import cache
+
+TRANSLITERATION_CACHE_SIZE = 4096
+
+
+def _decompose(value):
+    return unicodedata.normalize('NFKD', value).encode(
+        'ascii', 'ignore').decode('ascii')
+
+
+LATIN1_TABLE = dict(
+    (code, _decompose(six.unichr(code))) for code in range(0x80, 0x100))
+
+
+def _is_ascii(value):
+    try:
+        value.encode('ascii')
+    except UnicodeError:
+        return False
+    return True
+
+
+if hasattr(str, 'isascii'):
+    _is_ascii = str.isascii  # noqa: F811
+
+
+def transliterate(value):
+    """
+    Returns `value` with its non ASCII characters decomposed to ASCII, or
+    dropped when they have no ASCII decomposition.
+    """
+    if _is_ascii(value):
+        return value
+    value = value.translate(LATIN1_TABLE)
+    if _is_ascii(value):
+        return value
+    return _decompose(value)
+
+
+to_ascii = cache.memoize(transliterate, TRANSLITERATION_CACHE_SIZE)
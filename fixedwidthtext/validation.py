@@ -0,0 +1,124 @@
+# coding: utf-8
+"""
+Batch validation: parses many lines and returns a structured report of the
+invalid ones instead of raising. Valid lines pay a single try block per
+line; lines that fail are diagnosed field by field afterwards.
+"""
+from collections import namedtuple
+
+from fixedwidthtext import exceptions, streams
+
+CONTINUE = 'continue'
+STOP = 'stop'
+
+FieldError = namedtuple(
+    'FieldError', 'line_number field offset raw_value code message')
+
+
+class ValidationReport(object):
+    def __init__(self):
+        self.records = []
+        self.errors = []
+        self.lines = 0
+        self.invalid_lines = 0
+        self.stopped = False
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def to_dicts(self):
+        return [error._asdict() for error in self.errors]
+
+    def __repr__(self):
+        return '<ValidationReport lines=%s invalid_lines=%s errors=%s>' % (
+            self.lines, self.invalid_lines, len(self.errors))
+
+
+def diagnose(model, line, line_number=None):
+    """
+    Returns the list of FieldError of an invalid line.
+    """
+    if isinstance(line, bytes):
+        line = line.decode(model._meta.encoding)
+    line = line.rstrip(u'\r\n')
+    if len(line) != model._meta.total_size:
+        message = 'String with wrong size, needed: %s, passed: %s' % (
+            model._meta.total_size, len(line))
+        return [FieldError(line_number, None, 0, line, 'size', message)]
+    errors = []
+    for name, start, end, field in model._meta.parse_plan:
+        raw = line[start:end]
+        try:
+            field.clean(raw, None)
+        except exceptions.ValidationError as e:
+            errors.append(FieldError(
+                line_number, name, start, raw, e.code or 'invalid',
+                str(e.message)))
+        except Exception as e:
+            errors.append(FieldError(
+                line_number, name, start, raw, 'invalid', str(e)))
+    return errors
+
+
+def validate_lines(model, lines, on_error=CONTINUE, max_errors=None,
+                   quarantine=None, keep_records=True, start_line=1):
+    """
+    Parses `lines` and returns a ValidationReport. `lines` is an iterable
+    of lines, or of (line_number, line) pairs when `start_line` is None.
+
+    on_error: CONTINUE with the next line or STOP at the first invalid one.
+    max_errors: stop once this many lines were invalid.
+    quarantine: path or file object that receives the invalid lines.
+    keep_records: keep the valid instances in report.records.
+    """
+    if start_line is not None:
+        lines = enumerate(lines, start_line)
+    report = ValidationReport()
+    writer = None
+    if quarantine is not None:
+        fileobj, should_close = streams.open_source(quarantine, 'wb')
+        writer = streams.LineWriter(
+            fileobj, '\n', model._meta.encoding, buffer_lines=1000)
+    try:
+        for line_number, line in lines:
+            report.lines += 1
+            try:
+                record = model(string=line, lazy=False)
+            except exceptions.ValidationError:
+                report.invalid_lines += 1
+                report.errors.extend(diagnose(model, line, line_number))
+                if writer is not None:
+                    if isinstance(line, bytes):
+                        line = line.decode(model._meta.encoding)
+                    writer.write(line.rstrip(u'\r\n'))
+                if on_error == STOP or (
+                        max_errors is not None and
+                        report.invalid_lines >= max_errors):
+                    report.stopped = True
+                    break
+                continue
+            if keep_records:
+                report.records.append(record)
+    finally:
+        if writer is not None:
+            writer.flush()
+            if should_close:
+                fileobj.close()
+    return report
+
+
+def validate_file(model, source, chunk_size=streams.DEFAULT_CHUNK_SIZE,
+                  **kwargs):
+    """
+    Same as validate_lines() for every line of `source`, a path or a file
+    object.
+    """
+    fileobj, should_close = streams.open_source(source)
+    try:
+        return validate_lines(
+            model, streams.iter_lines(fileobj, chunk_size),
+            start_line=None, **kwargs)
+    finally:
+        if should_close:
+            fileobj.close()
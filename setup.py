@@ -51,5 +51,9 @@ with open('README.rst') as f:
         ],
         install_requires=[
             'six'
-        ]
+        ],
+        extras_require={
+            'numpy': ['numpy'],
+            'pandas': ['numpy', 'pandas'],
+        }
     )
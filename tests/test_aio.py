@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    name = fields.CharField(size=5)
+    amount = fields.IntegerField(size=4)
+
+
+class MemoryWriter(object):
+    def __init__(self):
+        self.data = b''
+        self.drains = 0
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        self.drains += 1
+
+
+def reader_with(content):
+    reader = asyncio.StreamReader()
+    reader.feed_data(content)
+    reader.feed_eof()
+    return reader
+
+
+async def collect(stream):
+    return [record async for record in stream]
+
+
+class TestAiterStream(unittest.TestCase):
+    def setUp(self):
+        self.content = b''.join(
+            b'n%04d%04d\r\n' % (i, i) for i in range(30))
+
+    def _read(self, content, **kwargs):
+        async def run():
+            stream = Payment.aiter_stream(reader_with(content), **kwargs)
+            return await collect(stream)
+        return asyncio.run(run())
+
+    def test_should_iterate_records(self):
+        records = self._read(self.content, chunk_size=7, batch_size=4)
+        self.assertEqual([r.amount for r in records], list(range(30)))
+
+    def test_should_parse_large_batches_in_executor(self):
+        with ThreadPoolExecutor(1) as executor:
+            records = self._read(
+                self.content, batch_size=10, executor=executor,
+                executor_threshold=5)
+        self.assertEqual(len(records), 30)
+
+    def test_should_split_by_size(self):
+        content = self.content.replace(b'\r\n', b'')
+        records = self._read(content, newline=False, chunk_size=4)
+        self.assertEqual(records[-1].name, 'n0029')
+
+    def test_should_skip_detected_terminators_by_stride(self):
+        records = self._read(self.content, newline=False, chunk_size=4)
+        self.assertEqual([r.amount for r in records], list(range(30)))
+
+    def test_should_report_line_numbers(self):
+        content = self.content + b'n0030abcd\r\n'
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            self._read(content)
+        self.assertEqual(cm.exception.line_number, 31)
+
+
+class TestAwriteMany(unittest.TestCase):
+    def setUp(self):
+        self.rows = [('n%04d' % i, i) for i in range(5)]
+
+    def test_should_write_records_and_drain(self):
+        writer = MemoryWriter()
+        count = asyncio.run(Payment.awrite_many(
+            self.rows, writer, batch_size=2))
+        self.assertEqual(count, 5)
+        self.assertEqual(writer.drains, 3)
+        self.assertEqual(writer.data, b''.join(
+            b'n%04d%04d\r\n' % (i, i) for i in range(5)))
+
+    def test_should_accept_async_iterables(self):
+        async def rows():
+            for row in self.rows:
+                yield row
+
+        writer = MemoryWriter()
+        asyncio.run(Payment.awrite_many(
+            rows(), writer, line_terminator='\n', validate=False,
+            executor_threshold=1))
+        self.assertEqual(writer.data.count(b'\n'), 5)
@@ -0,0 +1,29 @@
+import unittest
+
+from fixedwidthtext import cache
+
+
+class TestMemoize(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def _function(self, value):
+        self.calls.append(value)
+        return value * 2
+
+    def test_should_cache_results(self):
+        function = cache.memoize(self._function, 2)
+        self.assertEqual([function(1), function(1)], [2, 2])
+        self.assertEqual(self.calls, [1])
+
+    def test_should_evict_least_recently_used(self):
+        function = cache.memoize(self._function, 2)
+        for value in (1, 2, 1, 3, 1, 2):
+            function(value)
+        self.assertEqual(self.calls, [1, 2, 3, 2])
+
+    def test_zero_should_disable_cache(self):
+        function = cache.memoize(self._function, 0)
+        function(1)
+        function(1)
+        self.assertEqual(self.calls, [1, 1])
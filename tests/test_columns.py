@@ -0,0 +1,228 @@
+import array
+import datetime
+import io
+from decimal import Decimal
+
+import unittest
+
+from fixedwidthtext import columns, exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    name = fields.CharField(size=6)
+    count = fields.IntegerField(size=3)
+    due = fields.DateField()
+    at = fields.TimeField()
+    amount = fields.DecimalField(size=6, decimal_places=2)
+
+
+class ScaledPayment(LineManager):
+    name = fields.CharField(size=6)
+    count = fields.IntegerField(size=3)
+    due = fields.DateField()
+    at = fields.TimeField()
+    amount = fields.DecimalField(size=6, decimal_places=2, as_integer=True)
+
+
+@unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+class TestReadColumns(unittest.TestCase):
+    def setUp(self):
+        self.content = (
+            b'Maria 001201606040830012345\r\n'
+            b'Jose  -12201613012359000100\r\n'
+            b'Ana   100200002290000999999')
+
+    def test_should_decode_each_field_type(self):
+        result = Payment.read_columns(io.BytesIO(self.content))
+        self.assertEqual(list(result), ['name', 'count', 'due', 'at',
+                                        'amount'])
+        self.assertEqual(result['name'].tolist(), ['Maria', 'Jose', 'Ana'])
+        self.assertEqual(result['count'].tolist(), [1, -12, 100])
+        self.assertEqual(result['amount'].tolist(), [12345, 100, 999999])
+        self.assertEqual(result['due'][0].item(), datetime.date(2016, 6, 4))
+        self.assertEqual(result['due'][2].item(), datetime.date(2000, 2, 29))
+        self.assertEqual(result['at'][1].item(),
+                         datetime.timedelta(hours=23, minutes=59))
+
+    def test_invalid_dates_should_be_nat(self):
+        result = Payment.read_columns(io.BytesIO(self.content))
+        self.assertTrue(columns.numpy.isnat(result['due'][1]))
+
+    def test_should_follow_field_formats(self):
+        class Formats(LineManager):
+            due = fields.DateField(format='DDMMYYYY')
+            at = fields.TimeField(format='HHMMSS')
+            short = fields.DateField(format='YYMMDD')
+        line = '31122016123045241231'
+        expected = Formats(string=line)
+        result = Formats.read_columns(io.BytesIO(line.encode('latin-1')))
+        self.assertEqual(result['due'][0].item(), expected.due)
+        self.assertEqual(result['short'][0].item(), expected.short)
+        self.assertEqual(result['at'][0].item(), datetime.timedelta(
+            hours=12, minutes=30, seconds=45))
+
+    def test_invalid_times_should_be_nat(self):
+        content = self.content.replace(b'0830', b'2460')
+        result = Payment.read_columns(io.BytesIO(content))
+        self.assertTrue(columns.numpy.isnat(result['at'][0]))
+
+    def test_should_raise_validation_error_on_invalid_integer(self):
+        content = self.content.replace(b'001', b'0x1')
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.read_columns(io.BytesIO(content))
+
+    def test_should_read_files_without_terminator(self):
+        content = self.content.replace(b'\r\n', b'')
+        result = Payment.read_columns(io.BytesIO(content))
+        self.assertEqual(result['count'].tolist(), [1, -12, 100])
+
+    def test_should_reject_truncated_last_record(self):
+        content = self.content[:-3]
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            Payment.read_columns(io.BytesIO(content))
+        self.assertEqual(cm.exception.code, 'size')
+        self.assertEqual(cm.exception.line_number, 3)
+
+    def test_should_default_to_meta_encoding(self):
+        class Dos(LineManager):
+            name = fields.CharField(size=4)
+
+            class Meta:
+                encoding = 'cp850'
+        result = Dos.read_columns(io.BytesIO(u'Jos\xe9'.encode('cp850')))
+        self.assertEqual(result['name'].tolist(), [u'Jos\xe9'])
+
+    def test_should_reject_multi_byte_encodings(self):
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.read_columns(io.BytesIO(self.content), encoding='utf-8')
+
+
+class TestWriteColumns(unittest.TestCase):
+    def setUp(self):
+        self.columns = {
+            'name': ['Maria', 'Ana'],
+            'count': [1, 100],
+            'due': [datetime.date(2016, 6, 4), datetime.date(2000, 2, 29)],
+            'at': [datetime.time(8, 30), datetime.time(0, 0)],
+            'amount': [Decimal('123.45'), Decimal('9999.99')]}
+        self.expected = (b'Maria 001201606040830012345\r\n'
+                         b'Ana   100200002290000999999\r\n')
+
+    def test_should_write_lists(self):
+        stream = io.BytesIO()
+        self.assertEqual(Payment.write_columns(self.columns, stream), 2)
+        self.assertEqual(stream.getvalue(), self.expected)
+
+    def test_should_match_format_row(self):
+        rows = zip(*[self.columns[name] for name in Payment._meta.fields])
+        buffer = columns.format_columns(
+            Payment, self.columns, line_terminator='\n')
+        self.assertEqual(bytes(buffer), ''.join(
+            Payment.format_row(row) + '\n' for row in rows).encode())
+
+    def test_should_write_array_module_arrays(self):
+        self.columns['count'] = array.array('i', [1, 100])
+        buffer = columns.format_columns(Payment, self.columns)
+        self.assertEqual(bytes(buffer), self.expected)
+
+    def test_should_use_defaults_for_missing_columns(self):
+        class Defaults(LineManager):
+            kind = fields.CharField(size=1, static_val='D')
+            count = fields.IntegerField(size=2)
+        buffer = columns.format_columns(Defaults, {'count': [1, 2]}, '')
+        self.assertEqual(bytes(buffer), b'D01D02')
+
+    def test_should_report_line_of_wide_values(self):
+        self.columns['count'] = [1, 1000]
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            columns.format_columns(Payment, self.columns)
+        self.assertEqual(ctx.exception.code, 'max_size')
+        self.assertEqual(ctx.exception.line_number, 2)
+
+    def test_should_report_line_of_invalid_values(self):
+        self.columns['due'] = [datetime.date(2016, 6, 4), None]
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            columns.format_columns(Payment, self.columns)
+        self.assertEqual(ctx.exception.line_number, 2)
+        self.assertIn('due', str(ctx.exception))
+
+    def test_should_reject_missing_columns_without_default(self):
+        del self.columns['amount']
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            columns.format_columns(Payment, self.columns)
+        self.assertEqual(ctx.exception.code, 'required')
+
+    @unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_should_report_line_of_nat(self):
+        content = self.expected.replace(b'20000229', b'20000230')
+        result = ScaledPayment.read_columns(io.BytesIO(content))
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            ScaledPayment.write_columns(result, io.BytesIO())
+        self.assertEqual(ctx.exception.line_number, 2)
+
+    @unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_should_round_trip_seconds(self):
+        class Times(LineManager):
+            at = fields.TimeField(format='HHMMSS')
+        content = b'123045\r\n235959\r\n'
+        stream = io.BytesIO()
+        Times.write_columns(Times.read_columns(io.BytesIO(content)), stream)
+        self.assertEqual(stream.getvalue(), content)
+
+    def test_should_reject_columns_of_different_lengths(self):
+        self.columns['count'] = [1]
+        with self.assertRaises(exceptions.ValidationError):
+            columns.format_columns(Payment, self.columns)
+
+    def test_should_reject_unknown_columns(self):
+        self.columns['missing'] = [1, 2]
+        with self.assertRaises(exceptions.ValidationError):
+            columns.format_columns(Payment, self.columns)
+
+    @unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_should_round_trip_read_columns(self):
+        result = ScaledPayment.read_columns(io.BytesIO(self.expected))
+        stream = io.BytesIO()
+        ScaledPayment.write_columns(result, stream)
+        self.assertEqual(stream.getvalue(), self.expected)
+
+    @unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_should_round_trip_every_field_type(self):
+        class Everything(LineManager):
+            name = fields.CharField(size=6)
+            code = fields.StringField(size=3)
+            count = fields.IntegerField(size=3)
+            due = fields.DateField(format='DDMMYYYY')
+            at = fields.TimeField(format='HHMMSS')
+            amount = fields.DecimalField(size=10, decimal_places=2)
+            cents = fields.DecimalField(
+                size=6, decimal_places=2, as_integer=True)
+        content = (b'Maria ABC001040620160830150000001234012345\r\n'
+                   b'Jose  XY -12290220002359590000000001000100\r\n')
+        stream = io.BytesIO()
+        Everything.write_columns(
+            Everything.read_columns(io.BytesIO(content)), stream)
+        self.assertEqual(stream.getvalue(), content)
+
+    def test_decimal_integers_should_mean_the_same_in_every_column(self):
+        containers = [[12, 9], array.array('q', [12, 9])]
+        if columns.numpy is not None:
+            containers.append(columns.numpy.array([12, 9]))
+        for container in containers:
+            self.columns['amount'] = container
+            for model in (Payment, ScaledPayment):
+                buffer = columns.format_columns(model, self.columns, '')
+                self.assertEqual(bytes(buffer[21:27]), b'000012')
+
+    @unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_should_format_negative_integer_arrays(self):
+        self.columns['count'] = columns.numpy.array([-12, 100])
+        buffer = columns.format_columns(Payment, self.columns)
+        self.assertEqual(bytes(buffer[6:9]), b'-12')
+
+    @unittest.skipIf(columns.numpy is None, 'numpy is not installed')
+    def test_should_format_str_arrays(self):
+        self.columns['name'] = columns.numpy.array(['Maria', 'Ana'])
+        buffer = columns.format_columns(Payment, self.columns)
+        self.assertEqual(bytes(buffer), self.expected)
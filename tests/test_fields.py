@@ -4,7 +4,7 @@ from decimal import Decimal
 import unittest
 
 from fixedwidthtext.fields import (
-    Field, DecimalField, IntegerField, DateField, StringField)
+    Field, DecimalField, IntegerField, DateField, StringField, TimeField)
 
 from fixedwidthtext import exceptions
 
@@ -38,6 +38,18 @@ class TestField(unittest.TestCase):
         with self.assertRaises(exceptions.ValidationError):
             Field(size=None)
 
+    def test_choices_should_be_precomputed(self):
+        field = Field(size=1, choices=(('A', 'Active'), ('I', 'Inactive')))
+        self.assertEqual(field.choice_values, frozenset(['A', 'I']))
+        self.assertEqual(field.get_display('I'), 'Inactive')
+
+    def test_check_choice_should_raise_validation_error(self):
+        field = Field(size=1, choices=(('A', 'Active'),))
+        self.assertEqual(field.check_choice('A'), 'A')
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            field.check_choice('B')
+        self.assertEqual(cm.exception.code, 'invalid_choice')
+
     def _default_attr(self):
         return {
             'size': 10,
@@ -172,3 +184,145 @@ class TestDecimalField(TestField):
         with self.assertRaises(exceptions.ValidationError):
             self.field.to_python('avc')
 
+
+    def test_value_to_string_should_honour_decimal_places(self):
+        field = DecimalField(size=8, decimal_places=3, name='value')
+        response = field.value_to_string(self._object(Decimal('1.2345')))
+        self.assertEqual(response, '00001234')
+
+    def test_value_to_string_should_round_half_to_even(self):
+        response = self.field.value_to_string(self._object(Decimal('0.125')))
+        self.assertEqual(response, '0000000012')
+
+    def test_value_to_string_should_format_negative_values(self):
+        response = self.field.value_to_string(self._object(Decimal('-1.5')))
+        self.assertEqual(response, '-000000150')
+
+    def test_to_python_should_return_negative_decimal(self):
+        response = self.field.to_python('-000012345')
+        self.assertEqual(response, Decimal('-123.45'))
+
+    def test_to_python_should_keep_decimal_places_as_exponent(self):
+        response = self.field.to_python('0000000000')
+        self.assertEqual(str(response), '0.00')
+
+    def test_to_python_without_decimal_places(self):
+        field = DecimalField(size=4, decimal_places=0, name='value')
+        self.assertEqual(field.to_python('0012'), Decimal(12))
+
+    def test_to_python_should_accept_numbers(self):
+        self.assertEqual(self.field.to_python(12), Decimal(12))
+        self.assertEqual(self.field.to_python(1.5), Decimal('1.5'))
+
+    def test_to_python_should_raise_validation_error_with_dot(self):
+        with self.assertRaises(exceptions.ValidationError):
+            self.field.to_python('0000123.45')
+
+    def test_should_not_round_wide_values(self):
+        field = DecimalField(size=32, decimal_places=2, name='value')
+        raw = '12345678901234567890123456789012'
+        value = field.to_python(raw)
+        self.assertEqual(value, Decimal('123456789012345678901234567890.12'))
+        self.assertEqual(field.format_value(value), raw)
+
+
+class TestDecimalFieldAsInteger(TestField):
+    def setUp(self):
+        self.field = DecimalField(
+            size=10, decimal_places=2, name='value', as_integer=True)
+        self.object = self._object(12345)
+
+    def test_to_python_should_return_scaled_integer(self):
+        self.assertEqual(self.field.to_python('0000012345'), 12345)
+
+    def test_to_python_should_scale_decimals(self):
+        self.assertEqual(self.field.to_python(Decimal('1.5')), 150)
+
+    def test_to_python_should_scale_floats(self):
+        self.assertEqual(self.field.to_python(12.34), 1234)
+        self.assertEqual(self.field.to_python(Decimal('12.34')), 1234)
+
+    def test_value_to_string_should_not_scale_integers(self):
+        response = self.field.value_to_string(self.object)
+        self.assertEqual(response, '0000012345')
+
+
+class TestDateFieldFormats(TestField):
+    def setUp(self):
+        self.field = DateField(name='value', format='DDMMYYYY')
+        self.object = self._object(datetime.date(2016, 6, 4))
+
+    def test_size_should_follow_format(self):
+        self.assertEqual(self.field.size, 8)
+        self.assertEqual(DateField(format='YYMMDD').size, 6)
+
+    def test_to_python_should_use_format(self):
+        self.assertEqual(self.field.to_python('04062016'),
+                         datetime.date(2016, 6, 4))
+
+    def test_value_to_string_should_use_format(self):
+        self.assertEqual(self.field.value_to_string(self.object), '04062016')
+
+    def test_two_digit_years_should_follow_strptime_pivot(self):
+        field = DateField(format='YYMMDD')
+        self.assertEqual(field.to_python('680101'), datetime.date(2068, 1, 1))
+        self.assertEqual(field.to_python('690101'), datetime.date(1969, 1, 1))
+
+    def test_formats_should_accept_separators(self):
+        field = DateField(name='value', format='DD/MM/YYYY')
+        self.assertEqual(field.to_python('04/06/2016'),
+                         datetime.date(2016, 6, 4))
+        self.assertEqual(field.value_to_string(self.object), '04/06/2016')
+
+    def test_invalid_date_should_raise_validation_error(self):
+        with self.assertRaises(exceptions.ValidationError):
+            self.field.to_python('31022016')
+
+    def test_invalid_date_should_use_custom_message(self):
+        field = DateField(error_messages={'invalid_date': 'Bad %s'})
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            field.to_python('20160231')
+        self.assertEqual(ctx.exception.message, 'Bad 20160231')
+        self.assertEqual(ctx.exception.code, 'invalid_value')
+
+    def test_format_without_day_should_raise_validation_error(self):
+        with self.assertRaises(exceptions.ValidationError):
+            DateField(format='YYYYMM')
+
+    def test_conversions_should_be_cached(self):
+        self.field.to_python('04062016')
+        self.field.to_python('04062016')
+        self.assertEqual(self.field.parse_raw.cache_info().hits, 1)
+
+    def test_cache_should_be_bounded(self):
+        field = DateField(cache_size=2)
+        for day in ('01', '02', '03'):
+            field.to_python('201606' + day)
+        self.assertEqual(field.parse_raw.cache_info().currsize, 2)
+
+
+class TestTimeField(TestField):
+    def setUp(self):
+        self.field = TimeField(name='value')
+        self.object = self._object(datetime.time(8, 9, 10))
+
+    def test_default_format_should_be_hours_and_minutes(self):
+        self.assertEqual(self.field.size, 4)
+        self.assertEqual(self.field.to_python('0809'), datetime.time(8, 9))
+        self.assertEqual(self.field.value_to_string(self.object), '0809')
+
+    def test_invalid_time_should_use_custom_message(self):
+        field = TimeField(error_messages={'invalid_time': 'Bad %s'})
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            field.to_python('2460')
+        self.assertEqual(ctx.exception.message, 'Bad 2460')
+
+    def test_should_accept_seconds_format(self):
+        field = TimeField(name='value', format='HHMMSS')
+        self.assertEqual(field.size, 6)
+        self.assertEqual(field.to_python('080910'), datetime.time(8, 9, 10))
+        self.assertEqual(field.value_to_string(self.object), '080910')
+
+    def test_invalid_time_should_raise_validation_error(self):
+        with self.assertRaises(exceptions.ValidationError):
+            self.field.to_python('2561')
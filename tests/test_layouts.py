@@ -0,0 +1,79 @@
+import io
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.layouts import FileLayout
+from fixedwidthtext.models import LineManager
+
+
+class Header(LineManager):
+    record_type = fields.CharField(size=1)
+    company = fields.CharField(size=9)
+
+
+class Detail(LineManager):
+    record_type = fields.CharField(size=1)
+    amount = fields.IntegerField(size=6)
+
+
+class Trailer(LineManager):
+    record_type = fields.CharField(size=1)
+    total = fields.IntegerField(size=4)
+
+
+class DosHeader(LineManager):
+    record_type = fields.CharField(size=1)
+    company = fields.CharField(size=9)
+
+    class Meta:
+        encoding = 'cp850'
+
+
+class TestFileLayout(unittest.TestCase):
+    def setUp(self):
+        self.layout = FileLayout(0, 1, {'0': Header, '1': Detail})
+        self.layout.register('9', Trailer)
+        self.content = (
+            b'0ACME     \r\n1000100\r\n1000250\r\n90002\r\n')
+
+    def test_should_dispatch_each_line_to_its_model(self):
+        records = list(self.layout.iter_file(io.BytesIO(self.content)))
+        self.assertEqual([type(r) for r in records],
+                         [Header, Detail, Detail, Trailer])
+        self.assertEqual(records[2].amount, 250)
+        self.assertEqual(records[0].company, 'ACME')
+
+    def test_should_count_records_by_type(self):
+        list(self.layout.iter_file(io.BytesIO(self.content)))
+        self.assertEqual(self.layout.counters['1'], 2)
+        self.assertEqual(self.layout.counters['9'], 1)
+
+    def test_should_raise_on_unknown_type_with_line_number(self):
+        content = self.content + b'5abc\r\n'
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            list(self.layout.iter_file(io.BytesIO(content)))
+        self.assertEqual(cm.exception.line_number, 5)
+
+    def test_should_reject_keys_with_wrong_size(self):
+        with self.assertRaises(exceptions.ValidationError):
+            self.layout.register('10', Detail)
+
+    def test_parse_line_should_return_instance(self):
+        self.assertEqual(self.layout.parse_line('90002').total, 2)
+
+    def test_parse_line_should_accept_bytes(self):
+        record = self.layout.parse_line(b'90002\r\n')
+        self.assertEqual(record.total, 2)
+
+    def test_should_parse_bytes_in_each_model_encoding(self):
+        self.layout.register('0', DosHeader)
+        content = u'0Jos\xe9     \r\n90002\r\n'.encode('cp850')
+        records = list(self.layout.iter_file(io.BytesIO(content)))
+        self.assertEqual(records[0].company, u'Jos\xe9')
+
+    def test_should_not_count_invalid_lines(self):
+        content = self.content + b'1abc\r\n'
+        with self.assertRaises(exceptions.ValidationError):
+            list(self.layout.iter_file(io.BytesIO(content)))
+        self.assertEqual(self.layout.counters['1'], 2)
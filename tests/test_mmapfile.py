@@ -0,0 +1,86 @@
+import os
+import tempfile
+from decimal import Decimal
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.mmapfile import MmapRecordFile
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    name = fields.CharField(size=5)
+    amount = fields.DecimalField(size=6, decimal_places=2)
+
+
+class TestMmapRecordFile(unittest.TestCase):
+    def _open(self, content, model=Payment, encoding=None):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        records = MmapRecordFile(model, f.name, encoding=encoding)
+        self.addCleanup(records.close)
+        return records
+
+    def setUp(self):
+        self.records = self._open(
+            b''.join(b'n%04d%06d\r\n' % (i, i) for i in range(10)))
+
+    def test_should_have_length(self):
+        self.assertEqual(len(self.records), 10)
+
+    def test_should_access_records_by_index(self):
+        self.assertEqual(self.records[3].name, 'n0003')
+        self.assertEqual(self.records[-1].amount, Decimal('0.09'))
+
+    def test_should_decode_fields_lazily(self):
+        record = self.records[5]
+        self.assertNotIn('amount', record.__dict__)
+        record.amount
+        self.assertIn('amount', record.__dict__)
+
+    def test_should_slice(self):
+        names = [r.name for r in self.records[2:8:3]]
+        self.assertEqual(names, ['n0002', 'n0005'])
+
+    def test_should_raise_index_error(self):
+        with self.assertRaises(IndexError):
+            self.records[10]
+
+    def test_to_model_should_return_instance(self):
+        model = self.records[1].to_model()
+        self.assertTrue(isinstance(model, Payment))
+        self.assertEqual(model.to_string(), 'n0001000001')
+
+    def test_should_report_record_number_on_invalid_field(self):
+        records = self._open(b'n0000000001n0001abcdef')
+        self.assertEqual(len(records), 2)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            records[1].amount
+        self.assertEqual(cm.exception.line_number, 2)
+
+    def test_should_open_empty_files(self):
+        self.assertEqual(len(self._open(b'')), 0)
+
+    def test_should_default_to_meta_encoding(self):
+        class Dos(LineManager):
+            name = fields.CharField(size=4)
+
+            class Meta:
+                encoding = 'cp850'
+        records = self._open(u'Jos\xe9'.encode('cp850'), model=Dos)
+        self.assertEqual(records[0].name, u'Jos\xe9')
+
+    def test_should_reject_multi_byte_encodings(self):
+        with self.assertRaises(exceptions.ValidationError):
+            self._open(b'n0000000001', encoding='utf-8')
+
+    def test_should_reject_truncated_last_record(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            self._open(b'n0000000001\r\nn0001000002\r\nqq')
+        self.assertEqual(cm.exception.code, 'size')
+        self.assertEqual(cm.exception.line_number, 3)
+
+    def test_should_accept_missing_last_terminator(self):
+        self.assertEqual(len(self._open(b'n0000000001\r\nn0001000002')), 2)
@@ -1,8 +1,13 @@
 import datetime
+import io
+import os
+import pathlib
+import pickle
+import tempfile
 from decimal import Decimal
 
 from fixedwidthtext.models import LineManager, Options
-from fixedwidthtext import fields
+from fixedwidthtext import exceptions, fields
 
 import unittest
 
@@ -90,3 +95,554 @@ class TestParserWrite(unittest.TestCase):
         expected = 'Joao      Pereira   02420161201080900100000'
         self.assertEqual(response, expected)
 
+
+
+class TestIterFile(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            'Pedro     Almeida   01420161201121500054312',
+            'Joao      Pereira   02420161201080900100000']
+
+    def _stream(self, terminator='\r\n'):
+        content = terminator.join(self.lines) + terminator
+        return io.BytesIO(content.encode('latin-1'))
+
+    def test_should_yield_instances_for_each_line(self):
+        records = list(ExampleLineManager.iter_file(
+            self._stream(), chunk_size=7))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].first_name, 'Pedro')
+        self.assertEqual(records[1].bank_balance, Decimal('1000.00'))
+
+    def test_should_be_lazy(self):
+        records = ExampleLineManager.iter_file(self._stream())
+        self.assertEqual(next(records).first_name, 'Pedro')
+
+    def test_should_split_by_total_size_without_newline(self):
+        records = list(ExampleLineManager.iter_file(
+            self._stream(terminator=''), chunk_size=10, newline=False))
+        self.assertEqual([r.age for r in records], [14, 24])
+
+    def test_should_read_text_streams(self):
+        stream = io.StringIO(u'\n'.join(self.lines))
+        records = list(ExampleLineManager.iter_file(stream))
+        self.assertEqual(records[1].last_name, 'Pereira')
+
+    def test_should_skip_terminators_of_text_streams_without_newline(self):
+        stream = io.StringIO(u'\n'.join(self.lines) + u'\n')
+        records = list(ExampleLineManager.iter_file(
+            stream, chunk_size=10, newline=False))
+        self.assertEqual([r.last_name for r in records],
+                         ['Almeida', 'Pereira'])
+
+    def test_should_reject_multi_byte_encodings_without_newline(self):
+        with self.assertRaises(exceptions.ValidationError):
+            list(ExampleLineManager.iter_file(
+                self._stream(), encoding='utf-8', newline=False))
+
+    def test_should_read_from_path(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(self._stream().getvalue())
+        try:
+            records = list(ExampleLineManager.iter_file(f.name))
+        finally:
+            os.remove(f.name)
+        self.assertEqual(len(records), 2)
+
+    def test_should_report_line_number_on_validation_error(self):
+        self.lines.append('x' * 43)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            list(ExampleLineManager.iter_file(self._stream()))
+        self.assertEqual(cm.exception.line_number, 3)
+        self.assertTrue(str(cm.exception).startswith('Line 3: '))
+
+    def test_should_reuse_one_instance(self):
+        names = []
+        instances = set()
+        for record in ExampleLineManager.iter_file(
+                self._stream(), reuse=True):
+            names.append(record.first_name)
+            instances.add(id(record))
+        self.assertEqual(names, ['Pedro', 'Joao'])
+        self.assertEqual(len(instances), 1)
+
+
+class TestLoad(unittest.TestCase):
+    def test_should_parse_into_the_same_instance(self):
+        record = ExampleLineManager(
+            string='Pedro     Almeida   01420161201121500054312')
+        loaded = record.load('Joao      Pereira   02420161201080900100000')
+        self.assertIs(loaded, record)
+        self.assertEqual(record.first_name, 'Joao')
+        self.assertEqual(record.bank_balance, Decimal('1000.00'))
+
+    def test_should_reset_lazy_values(self):
+        record = LazyLineManager(string='OK00014')
+        self.assertEqual(record.amount, 14)
+        record.load('NO00024')
+        self.assertEqual(record.amount, 24)
+        self.assertEqual(record.status, 'NO')
+
+    def test_should_switch_a_lazy_instance_to_eager(self):
+        record = LazyLineManager(string='OK00014')
+        record.load('NO00024', lazy=False)
+        self.assertNotIn('_raw_line', record.__dict__)
+        self.assertEqual(record.amount, 24)
+
+    def test_should_load_slots_instances(self):
+        record = SlotsLineManager(string='OK00014')
+        record.load(b'NO00024\r\n')
+        self.assertEqual((record.status, record.amount), ('NO', 24))
+
+
+class TestParsePlan(unittest.TestCase):
+    def test_should_compute_offsets_in_field_order(self):
+        plan = ExampleLineManager._meta.parse_plan
+        self.assertEqual(
+            [(name, start, end) for name, start, end, field in plan],
+            [('first_name', 0, 10), ('last_name', 10, 20), ('age', 20, 23),
+             ('date_joined', 23, 31), ('time_joined', 31, 35),
+             ('bank_balance', 35, 43)])
+
+    def test_should_report_invalid_field_name(self):
+        string = 'Pedro     Almeida   0xx20161201121500054312'
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            ExampleLineManager(string=string)
+        self.assertIn('age', str(cm.exception))
+
+
+class ChoicesLineManager(LineManager):
+    kind = fields.CharField(size=1, choices=(('A', 'Active'),))
+    value = fields.IntegerField(size=4)
+
+    class Meta:
+        verbose_name = 'choices'
+
+
+class GenericLineManager(LineManager):
+    first_name = fields.StringField(size=10)
+    age = fields.IntegerField(size=3)
+
+    class Meta:
+        codegen = False
+
+
+class TestCodegen(unittest.TestCase):
+    def setUp(self):
+        self.string = 'Pedro     Almeida   01420161201121500054312'
+
+    def test_should_generate_fast_functions(self):
+        self.assertTrue(ExampleLineManager._meta.codegen)
+        self.assertIn(
+            'string[20:23]', ExampleLineManager._fast_parse.__source__)
+        self.assertIn("'%03d'", ExampleLineManager._fast_to_string.__source__)
+
+    def test_generated_parse_should_not_round_wide_decimals(self):
+        class Wide(LineManager):
+            value = fields.DecimalField(size=32, decimal_places=2)
+        raw = '12345678901234567890123456789012'
+        self.assertTrue(Wide._meta.codegen)
+        self.assertEqual(Wide(string=raw).value,
+                         Decimal('123456789012345678901234567890.12'))
+        self.assertEqual(Wide(string=raw).to_string(), raw)
+
+    def test_generated_to_string_should_scale_decimals(self):
+        self.assertIn('f5.scaled(v5)',
+                      ExampleLineManager._fast_to_string.__source__)
+        parser = ExampleLineManager(string=self.string)
+        parser.bank_balance = Decimal('1.235')
+        self.assertEqual(parser.to_string()[-8:], '00000124')
+
+    def test_generated_parse_should_use_cached_dates(self):
+        source = ExampleLineManager._fast_parse.__source__
+        self.assertIn('f3.parse_raw(string[23:31])', source)
+
+    def test_generated_parse_should_match_generic_parse(self):
+        fast = ExampleLineManager(string=self.string)
+        generic = ExampleLineManager.__new__(ExampleLineManager)
+        generic._parse_and_clean(self.string)
+        self.assertEqual(fast.get_dicts(), generic.get_dicts())
+        self.assertEqual(fast.to_string(), self.string)
+
+    def test_generated_to_string_should_use_defaults(self):
+        parser = ExampleLineManager(
+            first_name='Joao', last_name='Pereira', age=24,
+            bank_balance=Decimal(1000))
+        parser.date_joined = None
+        self.assertEqual(parser._fast_to_string(),
+                         'Joao      Pereira   02420161201080900100000')
+
+    def test_fields_with_choices_should_check_choices(self):
+        self.assertIn('f0.check_choice(string[0:1].strip())',
+                      ChoicesLineManager._fast_parse.__source__)
+        self.assertEqual(ChoicesLineManager(string='A0012').value, 12)
+        with self.assertRaises(exceptions.ValidationError):
+            ChoicesLineManager(string='B0012')
+
+    def test_errors_should_fall_back_to_generic_messages(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            ExampleLineManager(string=self.string.replace('014', 'abc'))
+        self.assertIn('age', str(cm.exception))
+
+    def test_meta_should_disable_codegen(self):
+        self.assertFalse(GenericLineManager._meta.codegen)
+        parser = GenericLineManager(string='Pedro     014')
+        self.assertEqual(parser.to_string(), 'Pedro     014')
+
+    def test_meta_should_set_verbose_name(self):
+        self.assertEqual(ChoicesLineManager._meta.verbose_name, 'choices')
+
+
+class TestWriteMany(unittest.TestCase):
+    def setUp(self):
+        self.expected = 'Joao      Pereira   02420161201080900100000'
+        self.values = {
+            'first_name': 'Joao',
+            'last_name': 'Pereira',
+            'age': 24,
+            'bank_balance': Decimal(1000)}
+
+    def test_should_write_instances(self):
+        stream = io.BytesIO()
+        count = ExampleLineManager.write_many(
+            [ExampleLineManager(**self.values)] * 3, stream, buffer_lines=2)
+        self.assertEqual(count, 3)
+        self.assertEqual(stream.getvalue(),
+                         ((self.expected + '\r\n') * 3).encode('latin-1'))
+
+    def test_should_write_dicts_and_tuples(self):
+        row = ('Joao', 'Pereira', 24, None, None, Decimal(1000))
+        stream = io.StringIO()
+        ExampleLineManager.write_many(
+            [self.values, row], stream, line_terminator='\n')
+        self.assertEqual(stream.getvalue(), (self.expected + '\n') * 2)
+
+    def test_should_validate_dicts(self):
+        self.values['age'] = 'abc'
+        with self.assertRaises(exceptions.ValidationError):
+            ExampleLineManager.write_many([self.values], io.BytesIO())
+
+    def test_should_format_without_validation(self):
+        row = ('Joao', 'Pereira', 24, None, None, Decimal(1000))
+        for codegen in (True, False):
+            ExampleLineManager._meta.codegen = codegen
+            stream = io.StringIO()
+            try:
+                ExampleLineManager.write_many(
+                    [self.values, row], stream, line_terminator='\n',
+                    validate=False)
+            finally:
+                ExampleLineManager._meta.codegen = True
+            self.assertEqual(stream.getvalue(), (self.expected + '\n') * 2)
+
+    def test_should_reject_tuples_with_wrong_length(self):
+        with self.assertRaises(exceptions.ValidationError):
+            ExampleLineManager.write_many(
+                [('Joao',)], io.BytesIO(), validate=False)
+
+    def test_should_write_to_path(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            pass
+        try:
+            ExampleLineManager.write_many([self.values], f.name)
+            with open(f.name, 'rb') as written:
+                content = written.read()
+        finally:
+            os.remove(f.name)
+        self.assertEqual(content, (self.expected + '\r\n').encode('latin-1'))
+
+    def test_should_round_trip_path_like_objects(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            pass
+        self.addCleanup(os.remove, f.name)
+        path = pathlib.Path(f.name)
+        self.assertEqual(
+            ExampleLineManager.write_many([self.values], path), 1)
+        records = list(ExampleLineManager.iter_file(path))
+        self.assertEqual(records[0].last_name, 'Pereira')
+
+
+class LazyLineManager(LineManager):
+    status = fields.CharField(size=2)
+    amount = fields.IntegerField(size=5)
+
+    class Meta:
+        lazy = True
+
+
+class TestLazy(unittest.TestCase):
+    def test_should_clean_fields_on_first_access(self):
+        parser = LazyLineManager(string='OKxxxxx')
+        self.assertNotIn('status', parser.__dict__)
+        self.assertEqual(parser.status, 'OK')
+        self.assertIn('status', parser.__dict__)
+
+    def test_should_raise_on_access_of_invalid_field(self):
+        parser = LazyLineManager(string='OKxxxxx')
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            parser.amount
+        self.assertIn('amount', str(cm.exception))
+
+    def test_full_clean_should_raise_all_errors(self):
+        parser = LazyLineManager(string='OKxxxxx')
+        with self.assertRaises(exceptions.ValidationError):
+            parser.full_clean()
+
+    def test_full_clean_should_populate_fields(self):
+        parser = LazyLineManager(string='OK00012')
+        parser.full_clean()
+        self.assertEqual(parser.__dict__['amount'], 12)
+
+    def test_should_still_validate_line_size(self):
+        with self.assertRaises(exceptions.ValidationError):
+            LazyLineManager(string='OK')
+
+    def test_kwarg_should_enable_lazy_mode(self):
+        string = 'Pedro     Almeida   0xx20161201121500054312'
+        parser = ExampleLineManager(string=string, lazy=True)
+        self.assertEqual(parser.last_name, 'Almeida')
+
+    def test_to_string_should_load_fields(self):
+        parser = LazyLineManager(string='OK00012')
+        parser.amount = 7
+        self.assertEqual(parser.to_string(), 'OK00007')
+
+    def test_iter_file_should_accept_lazy(self):
+        stream = io.BytesIO(b'Pedro     Almeida   0xx20161201121500054312')
+        parser = next(ExampleLineManager.iter_file(stream, lazy=True))
+        self.assertEqual(parser.first_name, 'Pedro')
+
+    def test_class_attributes_should_still_be_fields(self):
+        self.assertTrue(isinstance(LazyLineManager.status, fields.Field))
+
+
+class SlotsLineManager(LineManager):
+    status = fields.CharField(size=2)
+    amount = fields.IntegerField(size=5)
+
+    class Meta:
+        slots = True
+
+
+class TestSlots(unittest.TestCase):
+    def test_instances_should_not_have_dict(self):
+        parser = SlotsLineManager(string='OK00012')
+        self.assertFalse(hasattr(parser, '__dict__'))
+        self.assertEqual(parser.amount, 12)
+        self.assertEqual(SlotsLineManager.__slots__, ('status', 'amount'))
+
+    def test_should_write_and_read(self):
+        parser = SlotsLineManager(status='OK', amount=3)
+        self.assertEqual(parser.to_string(), 'OK00003')
+        self.assertEqual(parser.get_dicts()[1]['value'], 3)
+
+    def test_fields_should_stay_in_meta(self):
+        self.assertEqual(list(SlotsLineManager._meta.fields),
+                         ['status', 'amount'])
+
+    def test_lazy_should_not_be_allowed(self):
+        with self.assertRaises(exceptions.ValidationError):
+            SlotsLineManager(string='OK00012', lazy=True)
+
+    def test_regular_models_should_keep_dict(self):
+        parser = ExampleLineManager(string='Pedro     Almeida   '
+                                           '01420161201121500054312')
+        self.assertTrue(hasattr(parser, '__dict__'))
+
+
+class DeclaredSlotsLineManager(LineManager):
+    __slots__ = ('extra',)
+    status = fields.CharField(size=2)
+    amount = fields.IntegerField(size=5)
+
+
+class TestDeclaredSlots(unittest.TestCase):
+    def test_should_merge_declared_slots_with_fields(self):
+        parser = DeclaredSlotsLineManager(string='OK00123')
+        parser.extra = 1
+        self.assertEqual((parser.status, parser.amount), ('OK', 123))
+        self.assertFalse(hasattr(parser, '__dict__'))
+        self.assertTrue(DeclaredSlotsLineManager._meta.slots)
+
+    def test_should_accept_field_names_in_slots(self):
+        class Model(LineManager):
+            __slots__ = ('a', 'b')
+            a = fields.CharField(size=3)
+            b = fields.IntegerField(size=2)
+        parser = Model(string='abc12')
+        self.assertEqual((parser.a, parser.b), ('abc', 12))
+        self.assertEqual(parser.to_string(), 'abc12')
+
+    def test_should_reject_lazy_models(self):
+        with self.assertRaises(exceptions.ValidationError):
+            class Model(LineManager):
+                __slots__ = ()
+                a = fields.CharField(size=3)
+
+                class Meta:
+                    lazy = True
+
+
+class TestToRecord(unittest.TestCase):
+    def test_should_return_namedtuple(self):
+        record = SlotsLineManager(string='OK00012').to_record()
+        self.assertEqual(record, ('OK', 12))
+        self.assertEqual(record.amount, 12)
+
+    def test_should_be_named_after_the_model(self):
+        record_class = SlotsLineManager._meta.record_class
+        self.assertEqual(record_class.__name__, 'SlotsLineManagerRecord')
+        self.assertEqual(record_class.__module__, __name__)
+
+    def test_should_pickle(self):
+        record = SlotsLineManager(string='OK00012').to_record()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(record, protocol))
+            self.assertEqual(loaded, record)
+            self.assertIs(type(loaded), type(record))
+
+
+class Utf8LineManager(LineManager):
+    name = fields.CharField(size=4)
+
+    class Meta:
+        encoding = 'utf-8'
+
+
+class TestBytesParsing(unittest.TestCase):
+    def setUp(self):
+        self.string = u'Jos\xe9      Almeida   01420161201121500054312'
+
+    def test_should_parse_bytes_like_strings(self):
+        parser = ExampleLineManager(string=self.string.encode('latin-1'))
+        expected = ExampleLineManager(string=self.string)
+        self.assertEqual(parser.get_dicts(), expected.get_dicts())
+        self.assertEqual(parser.first_name, u'Jos\xe9')
+        self.assertEqual(parser.bank_balance, Decimal('543.12'))
+
+    def test_should_generate_bytes_parser_for_single_byte_encodings(self):
+        source = ExampleLineManager._fast_parse_bytes.__source__
+        self.assertIn("decode('latin-1')", source)
+        self.assertIn('int(string[20:23])', source)
+        self.assertFalse(hasattr(Utf8LineManager, '_fast_parse_bytes'))
+
+    def test_should_decode_multi_byte_encodings(self):
+        parser = Utf8LineManager(string=u'Jos\xe9'.encode('utf-8'))
+        self.assertEqual(parser.name, u'Jos\xe9')
+
+    def test_should_raise_same_errors_as_strings(self):
+        invalid = self.string.replace('014', '0xx')
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            ExampleLineManager(string=invalid.encode('latin-1'))
+        with self.assertRaises(exceptions.ValidationError) as expected:
+            ExampleLineManager(string=invalid)
+        self.assertEqual(str(cm.exception), str(expected.exception))
+
+    def test_should_strip_line_terminators(self):
+        parser = ExampleLineManager(
+            string=(self.string + '\r\n').encode('latin-1'))
+        self.assertEqual(parser.age, 14)
+        self.assertEqual(ExampleLineManager(
+            string=self.string + '\r').age, 14)
+
+    def test_iter_file_should_read_by_stride(self):
+        content = (self.string + '\r\n') * 3
+        records = list(ExampleLineManager.iter_file(
+            io.BytesIO(content.encode('latin-1')), chunk_size=50,
+            newline=False))
+        self.assertEqual([r.first_name for r in records], [u'Jos\xe9'] * 3)
+
+    def test_iter_file_should_decode_other_encodings(self):
+        content = self.string.encode('utf-8')
+        records = list(ExampleLineManager.iter_file(
+            io.BytesIO(content), encoding='utf-8'))
+        self.assertEqual(records[0].first_name, u'Jos\xe9')
+
+
+class TestTrustedFormatting(unittest.TestCase):
+    def setUp(self):
+        self.expected = 'Joao      Pereira   02420161201080900100000'
+        self.row = ('Joao', 'Pereira', 24, None, None, Decimal(1000))
+
+    def test_format_row_should_format_tuples_and_dicts(self):
+        names = list(ExampleLineManager._meta.fields)
+        self.assertEqual(ExampleLineManager.format_row(self.row),
+                         self.expected)
+        self.assertEqual(ExampleLineManager.format_row(
+            dict(zip(names, self.row))), self.expected)
+
+    def test_format_row_should_check_widths(self):
+        row = ('Joao', 'Pereira', 12345, None, None, Decimal(1000))
+        for codegen in (True, False):
+            ExampleLineManager._meta.codegen = codegen
+            try:
+                with self.assertRaises(exceptions.ValidationError) as cm:
+                    ExampleLineManager.format_row(row)
+            finally:
+                ExampleLineManager._meta.codegen = True
+            self.assertEqual(cm.exception.code, 'max_size')
+            self.assertIn('age', str(cm.exception))
+
+    def test_construct_should_skip_clean(self):
+        parser = ExampleLineManager.construct(
+            first_name='Joao', last_name='Pereira', age=24,
+            bank_balance=Decimal(1000))
+        self.assertEqual(parser.to_string(), self.expected)
+
+    def test_to_string_should_check_widths(self):
+        parser = ExampleLineManager.construct(
+            first_name='Joao', last_name='Pereira', age=24,
+            bank_balance=Decimal(10 ** 7))
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            parser.to_string()
+        self.assertIn('bank_balance', str(cm.exception))
+
+
+class TestChoices(unittest.TestCase):
+    def test_should_expose_display_accessor(self):
+        parser = ChoicesLineManager(string='A0012')
+        self.assertEqual(parser.get_kind_display(), 'Active')
+
+    def test_display_should_fall_back_to_value(self):
+        parser = ChoicesLineManager.construct(kind='Z', value=1)
+        self.assertEqual(parser.get_kind_display(), 'Z')
+
+    def test_fields_without_choices_should_not_have_display(self):
+        self.assertFalse(hasattr(ChoicesLineManager, 'get_value_display'))
+
+
+class NormalizedLineManager(LineManager):
+    name = fields.StringField(size=10, normalize=True)
+    city = fields.StringField(size=8)
+
+
+class NormalizedLineLineManager(LineManager):
+    name = fields.StringField(size=10)
+    city = fields.StringField(size=8)
+
+    class Meta:
+        normalize = True
+
+
+class TestNormalize(unittest.TestCase):
+    def test_field_should_transliterate_to_str(self):
+        line = NormalizedLineManager(
+            name=u'Conceição', city=u'Bauru').to_string()
+        self.assertEqual(line, u'Conceicao Bauru   ')
+
+    def test_model_should_transliterate_the_line(self):
+        instance = NormalizedLineLineManager(name=u'José', city=u'Marília')
+        self.assertEqual(instance.to_string(), u'Jose      Marilia ')
+        self.assertEqual(
+            NormalizedLineLineManager.format_row((u'Zé', u'Içara')),
+            u'Ze        Icara   ')
+
+    def test_model_should_check_transliterated_widths(self):
+        instance = NormalizedLineLineManager(name=u'Straße', city=u'B')
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            instance.to_string()
+        self.assertEqual(ctx.exception.code, 'max_size')
+
+    def test_to_bytes_should_encode_in_meta_encoding(self):
+        self.assertEqual(
+            Utf8LineManager(name=u'João').to_bytes(), u'João'.encode('utf-8'))
@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    name = fields.CharField(size=5)
+    amount = fields.IntegerField(size=4)
+
+
+class LazyPayment(LineManager):
+    name = fields.CharField(size=5)
+    amount = fields.IntegerField(size=4)
+
+    class Meta:
+        lazy = True
+
+
+class TestParseFileParallel(unittest.TestCase):
+    def setUp(self):
+        self.lines = ['n%04d%04d' % (i, i) for i in range(25)]
+
+    def _write(self, content):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(content.encode('latin-1'))
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_should_return_batches_in_order(self):
+        path = self._write('\r\n'.join(self.lines) + '\r\n')
+        batches = list(Payment.parse_file_parallel(
+            path, workers=2, batch_records=10))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        amounts = [r.amount for batch in batches for r in batch]
+        self.assertEqual(amounts, list(range(25)))
+
+    def test_should_read_files_without_terminator(self):
+        path = self._write(''.join(self.lines))
+        batches = Payment.parse_file_parallel(
+            path, workers=2, batch_records=7, ordered=False)
+        amounts = [r.amount for batch in batches for r in batch]
+        self.assertEqual(sorted(amounts), list(range(25)))
+
+    def test_should_aggregate_errors_with_line_numbers(self):
+        self.lines[3] = 'n0003abcd'
+        self.lines[21] = 'n0021xxxx'
+        path = self._write('\n'.join(self.lines))
+        batches = Payment.parse_file_parallel(
+            path, workers=2, batch_records=10)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            for batch in batches:
+                pass
+        self.assertEqual(sorted(cm.exception.message), [4, 22])
+
+    def test_should_parse_lazy_models_in_workers(self):
+        self.lines[3] = 'n0003abcd'
+        path = self._write('\n'.join(self.lines))
+        batches = LazyPayment.parse_file_parallel(path, workers=2)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            records = next(batches)
+            self.assertNotIn('_raw_line', records[0].__dict__)
+            self.assertEqual(records[0].__dict__['amount'], 0)
+            next(batches)
+        self.assertEqual(list(cm.exception.message), [4])
+
+    def test_should_report_truncated_last_record(self):
+        path = self._write('\r\n'.join(self.lines[:2]) + '\r\nqq')
+        batches = Payment.parse_file_parallel(path, workers=2)
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            self.assertEqual(len(next(batches)), 2)
+            next(batches)
+        self.assertEqual(list(cm.exception.message), [3])
+        self.assertIn('wrong size', cm.exception.message[3])
+
+    def test_should_reject_multi_byte_encodings(self):
+        path = self._write(''.join(self.lines))
+        with self.assertRaises(exceptions.ValidationError):
+            next(Payment.parse_file_parallel(path, encoding='utf-8'))
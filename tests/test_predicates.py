@@ -0,0 +1,73 @@
+import io
+from decimal import Decimal
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    kind = fields.CharField(size=1)
+    bank = fields.IntegerField(size=3)
+    name = fields.CharField(size=6)
+    amount = fields.DecimalField(size=6, decimal_places=2)
+
+
+LINES = (b'1341Maria 000150\r\n'
+         b'3237Joao  000275\r\n'
+         b'3341Pedro 000100\r\n'
+         b'3001XXXXXXXXXXXX\r\n')
+
+
+class TestWhere(unittest.TestCase):
+    def test_should_compare_formatted_values(self):
+        where = Payment.where({'kind': '3', 'bank': 341})
+        self.assertTrue(where('3341Pedro 000100'))
+        self.assertFalse(where('3237Joao  000275'))
+
+    def test_should_match_bytes(self):
+        where = Payment.where({'name': 'Pedro'})
+        self.assertTrue(where(b'3341Pedro 000100'))
+        self.assertFalse(where(b'1341Maria 000150'))
+
+    def test_should_accept_collections_and_callables(self):
+        where = Payment.where({
+            'bank': (237, 341), 'amount': lambda raw: raw > '000120'})
+        self.assertTrue(where('3237Joao  000275'))
+        self.assertFalse(where('3341Pedro 000100'))
+        self.assertFalse(where('3001Pedro 000200'))
+
+    def test_should_reject_unknown_fields(self):
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.where({'missing': '1'})
+
+    def test_should_reject_values_that_do_not_fit(self):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            Payment.where({'bank': 1000})
+        self.assertEqual(ctx.exception.code, 'max_size')
+
+    def test_should_reject_text_longer_than_the_field(self):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            Payment.where({'name': 'Pedrosa'})
+        self.assertEqual(ctx.exception.code, 'max_size')
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.where({'name': ['Pedro', 'Pedrosa']})
+
+    def test_iter_file_should_skip_lines_before_parsing(self):
+        # The last line is invalid, but is never parsed.
+        records = list(Payment.iter_file(
+            io.BytesIO(LINES), where={'kind': '3', 'bank': (237, 341)}))
+        self.assertEqual([r.name for r in records], ['Joao', 'Pedro'])
+
+    def test_should_keep_line_numbers(self):
+        source = io.BytesIO(LINES)
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            list(Payment.iter_file(source, where={'bank': 1}))
+        self.assertEqual(ctx.exception.line_number, 4)
+
+    def test_should_compose_with_projection(self):
+        records = list(Payment.only('amount').iter_file(
+            io.StringIO(LINES.decode('latin-1')),
+            where={'kind': '3', 'name': ('Joao', 'Pedro')}))
+        self.assertEqual(records, [(Decimal('2.75'),), (Decimal('1.00'),)])
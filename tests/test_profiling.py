@@ -0,0 +1,80 @@
+import io
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    name = fields.CharField(size=5)
+    amount = fields.IntegerField(size=4)
+
+
+LINES = b'Maria0150\r\nJoao 0275\r\nPedroxxxx\r\n'
+
+
+class TestProfile(unittest.TestCase):
+    def test_should_count_field_phases(self):
+        with Payment.profile() as profile:
+            Payment(string='Maria0150')
+            with self.assertRaises(exceptions.ValidationError):
+                Payment(string='Pedroxxxx')
+        stats = profile.as_dict()
+        self.assertEqual(stats['model'], 'Payment')
+        self.assertEqual(stats['fields']['amount']['clean']['calls'], 2)
+        self.assertEqual(stats['fields']['amount']['to_python']['errors'], 1)
+        self.assertEqual(stats['fields']['name']['clean']['errors'], 0)
+        self.assertEqual(stats['phases']['_parse']['calls'], 2)
+        self.assertEqual(stats['phases']['_parse']['errors'], 1)
+        self.assertGreater(stats['phases']['_parse']['time'], 0)
+
+    def test_should_count_serialization(self):
+        with Payment.profile() as profile:
+            Payment(name='Ana', amount=1).to_string()
+            Payment.format_row(('Ana', 1))
+        stats = profile.as_dict()
+        self.assertEqual(stats['phases']['to_string']['calls'], 1)
+        self.assertEqual(stats['phases']['format_row']['calls'], 1)
+        self.assertEqual(
+            stats['fields']['name']['value_to_string']['calls'], 1)
+        self.assertEqual(stats['fields']['name']['format_value']['calls'], 1)
+
+    def test_should_count_file_throughput(self):
+        with Payment.profile() as profile:
+            records = list(Payment.iter_file(
+                io.BytesIO(LINES), where={'name': ('Maria', 'Joao')}))
+        self.assertEqual(len(records), 2)
+        files = profile.as_dict()['files']
+        self.assertEqual((files['files'], files['records']), (1, 3))
+        self.assertEqual(files['bytes'], 27)
+        self.assertGreater(files['records_per_second'], 0)
+
+    def test_should_restore_the_model_when_stopped(self):
+        field = Payment._meta.fields['amount']
+        with Payment.profile():
+            self.assertFalse(Payment._meta.codegen)
+        self.assertTrue(Payment._meta.codegen)
+        self.assertIsNone(Payment._meta.profile)
+        self.assertNotIn('to_python', field.__dict__)
+        self.assertNotIn('_parse', Payment.__dict__)
+        self.assertNotIn('format_row', Payment.__dict__)
+        self.assertEqual(Payment.format_row(('Ana', 1)), 'Ana  0001')
+
+    def test_should_not_count_when_disabled(self):
+        profile = Payment.profile()
+        Payment(string='Maria0150')
+        self.assertEqual(profile.as_dict()['phases']['_parse']['calls'], 0)
+
+    def test_should_reject_nested_profiles(self):
+        with Payment.profile():
+            with self.assertRaises(exceptions.ValidationError):
+                Payment.profile().start()
+
+    def test_reset_should_zero_counters(self):
+        with Payment.profile() as profile:
+            Payment(string='Maria0150')
+            profile.reset()
+            Payment(string='Joao 0275')
+        self.assertEqual(
+            profile.as_dict()['fields']['name']['clean']['calls'], 1)
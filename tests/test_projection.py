@@ -0,0 +1,94 @@
+import io
+import pickle
+from decimal import Decimal
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    kind = fields.CharField(size=1, choices=(('1', 'Credit'), ('2', 'Debit')))
+    account = fields.IntegerField(size=5)
+    name = fields.CharField(size=6)
+    amount = fields.DecimalField(size=6, decimal_places=2)
+
+
+class GenericPayment(LineManager):
+    kind = fields.CharField(size=1, choices=(('1', 'Credit'), ('2', 'Debit')))
+    account = fields.IntegerField(size=5)
+    name = fields.CharField(size=6)
+    amount = fields.DecimalField(size=6, decimal_places=2)
+
+    class Meta:
+        codegen = False
+
+
+LINES = b'100001Maria 000150\r\n200002Joao  000275\r\n'
+
+
+class TestProjection(unittest.TestCase):
+    def setUp(self):
+        self.projection = Payment.only('amount', 'account')
+
+    def test_should_return_only_selected_fields_in_order(self):
+        record = self.projection.parse('100001Maria 000150')
+        self.assertEqual(record, (Decimal('1.50'), 1))
+        self.assertEqual(record._fields, ('amount', 'account'))
+
+    def test_should_pickle_records(self):
+        record = self.projection.parse('100001Maria 000150')
+        self.assertEqual(
+            type(record).__name__, 'Payment_amount_accountRecord')
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(record, protocol))
+            self.assertEqual(loaded, record)
+            self.assertIs(type(loaded), type(record))
+
+    def test_should_build_projections_once(self):
+        self.assertIs(Payment.only('amount', 'account'), self.projection)
+
+    def test_should_parse_bytes_and_strip_terminator(self):
+        record = self.projection.parse(b'100001Maria 000150\r\n')
+        self.assertEqual(record.amount, Decimal('1.50'))
+
+    def test_should_skip_invalid_unselected_fields(self):
+        record = self.projection.parse('900001000000000150')
+        self.assertEqual(record.account, 1)
+
+    def test_should_validate_selected_fields(self):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            Payment.only('kind').parse('900001Maria 000150')
+        self.assertIn('kind', str(ctx.exception))
+
+    def test_should_validate_size(self):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            self.projection.parse('100001')
+        self.assertEqual(ctx.exception.code, 'size')
+
+    def test_should_reject_unknown_fields(self):
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.only('amount', 'missing')
+
+    def test_generic_parse_should_give_the_same_records(self):
+        line = '200002Joao  000275'
+        self.assertEqual(
+            GenericPayment.only('name', 'amount').parse(line),
+            Payment.only('name', 'amount').parse(line))
+
+    def test_iter_file_should_stream_projected_records(self):
+        records = list(self.projection.iter_file(io.BytesIO(LINES)))
+        self.assertEqual(
+            records, [(Decimal('1.50'), 1), (Decimal('2.75'), 2)])
+
+    def test_model_iter_file_should_accept_fields(self):
+        records = list(Payment.iter_file(
+            io.BytesIO(LINES), fields=['name']))
+        self.assertEqual([r.name for r in records], ['Maria', 'Joao'])
+
+    def test_iter_file_errors_should_have_line_number(self):
+        source = io.BytesIO(LINES + b'300003Pedro 000100\r\n')
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            list(Payment.iter_file(source, fields=['kind']))
+        self.assertEqual(ctx.exception.line_number, 3)
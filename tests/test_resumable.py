@@ -0,0 +1,128 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import unittest
+
+from fixedwidthtext import exceptions, fields
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    name = fields.CharField(size=5)
+    amount = fields.IntegerField(size=4)
+
+
+def build(count, terminator=b'\r\n'):
+    return b''.join(
+        b'n%04d%04d' % (i, i) + terminator for i in range(count))
+
+
+class TestRecordReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'remessa.txt')
+        self.checkpoint = os.path.join(self.directory, 'remessa.ckpt')
+        with open(self.path, 'wb') as f:
+            f.write(build(10))
+
+    def test_should_expose_index_and_offset(self):
+        reader = Payment.reader(self.path)
+        positions = [(reader.record_index, reader.offset, r.amount)
+                     for r in reader]
+        self.assertEqual(positions[3], (3, 33, 3))
+        self.assertEqual(len(positions), 10)
+
+    def test_should_start_at_record_or_offset(self):
+        records = list(Payment.iter_file(self.path, start_record=7))
+        self.assertEqual([r.amount for r in records], [7, 8, 9])
+        records = list(Payment.iter_file(
+            io.BytesIO(build(10, b'')), start_offset=72))
+        self.assertEqual([r.amount for r in records], [8, 9])
+
+    def test_should_keep_line_numbers_after_seeking(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'xxxxxxxxx\r\n')
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            list(Payment.iter_file(self.path, start_record=8))
+        self.assertEqual(ctx.exception.line_number, 11)
+
+    def test_should_reject_offsets_inside_records(self):
+        with self.assertRaises(exceptions.ValidationError) as ctx:
+            list(Payment.iter_file(self.path, start_offset=5))
+        self.assertEqual(ctx.exception.code, 'invalid_offset')
+
+    def test_should_iterate_again(self):
+        reader = Payment.reader(self.path, start_record=8)
+        self.assertEqual([r.amount for r in reader], [8, 9])
+        self.assertEqual([r.amount for r in reader], [8, 9])
+
+    def test_should_reject_multi_byte_encodings(self):
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.reader(self.path, encoding='utf-8')
+
+    def test_should_reject_text_streams(self):
+        with self.assertRaises(exceptions.ValidationError):
+            Payment.reader(io.StringIO(u'n00000000'))
+
+    def test_should_resume_from_checkpoint(self):
+        reader = Payment.reader(
+            self.path, checkpoint=self.checkpoint, checkpoint_every=3)
+        processed = []
+        for record in reader:
+            if record.amount == 7:
+                break  # crash while processing record 7
+            processed.append(record.amount)
+        self.assertEqual(reader.load_checkpoint()['record'], 6)
+        reader = Payment.reader(
+            self.path, checkpoint=self.checkpoint, checkpoint_every=3)
+        self.assertEqual([r.amount for r in reader], [6, 7, 8, 9])
+        self.assertEqual(
+            reader.load_checkpoint(),
+            {'record': 10, 'offset': 110, 'stride': 11})
+        self.assertEqual(list(Payment.reader(
+            self.path, checkpoint=self.checkpoint)), [])
+
+    def test_save_checkpoint_should_save_after_last_record(self):
+        reader = Payment.reader(self.path, checkpoint=self.checkpoint)
+        records = iter(reader)
+        next(records)
+        next(records)
+        reader.save_checkpoint()
+        self.assertEqual(reader.load_checkpoint()['record'], 2)
+        records.close()
+
+    def test_should_compose_with_projection_and_where(self):
+        records = list(Payment.reader(
+            self.path, fields=['amount'], where={'amount': (2, 8)},
+            start_record=1))
+        self.assertEqual(records, [(2,), (8,)])
+
+    def test_should_follow_appended_records(self):
+        def append():
+            time.sleep(0.05)
+            with open(self.path, 'ab') as f:
+                f.write(b'n0010')
+                f.flush()
+                time.sleep(0.05)
+                f.write(b'0010\r\nn00110011\r\n')
+        writer = threading.Thread(target=append)
+        writer.start()
+        reader = Payment.reader(
+            self.path, start_record=9, follow=True, poll_interval=0.01,
+            idle_timeout=0.5)
+        amounts = [r.amount for r in reader]
+        writer.join()
+        self.assertEqual(amounts, [9, 10, 11])
+
+    def test_follow_should_not_parse_incomplete_records(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'n00')
+        reader = Payment.reader(
+            self.path, start_record=8, follow=True, poll_interval=0.01,
+            idle_timeout=0.05)
+        self.assertEqual([r.amount for r in reader], [8, 9])
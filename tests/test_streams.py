@@ -0,0 +1,77 @@
+import io
+import os
+import pathlib
+import tempfile
+
+import unittest
+
+from fixedwidthtext import streams
+
+
+class TestOpenSource(unittest.TestCase):
+    def test_should_not_close_file_objects(self):
+        stream = io.BytesIO()
+        self.assertEqual(streams.open_source(stream, 'wb'), (stream, False))
+
+    def test_should_open_path_like_objects(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b'abc')
+        self.addCleanup(os.remove, f.name)
+        fileobj, should_close = streams.open_source(pathlib.Path(f.name))
+        with fileobj:
+            self.assertEqual(fileobj.read(), b'abc')
+        self.assertTrue(should_close)
+
+
+class TestIterLines(unittest.TestCase):
+    def test_should_split_lines_across_chunks(self):
+        stream = io.BytesIO(b'abc\r\ndef\r\nghi')
+        response = list(streams.iter_lines(stream, chunk_size=2))
+        self.assertEqual(response, [(1, b'abc'), (2, b'def'), (3, b'ghi')])
+
+    def test_should_skip_blank_lines_but_count_them(self):
+        stream = io.BytesIO(b'abc\n\ndef\n')
+        response = list(streams.iter_lines(stream))
+        self.assertEqual(response, [(1, b'abc'), (3, b'def')])
+
+    def test_should_split_text_streams(self):
+        stream = io.StringIO(u'abc\ndef')
+        response = list(streams.iter_lines(stream))
+        self.assertEqual(response, [(1, u'abc'), (2, u'def')])
+
+
+class TestIterStride(unittest.TestCase):
+    def test_should_cut_records_by_size(self):
+        stream = io.BytesIO(b'abcdefghi')
+        response = list(streams.iter_stride(stream, 3, chunk_size=4))
+        self.assertEqual(response, [(1, b'abc'), (2, b'def'), (3, b'ghi')])
+
+    def test_should_yield_incomplete_last_record(self):
+        stream = io.BytesIO(b'abcde')
+        response = list(streams.iter_stride(stream, 3))
+        self.assertEqual(response, [(1, b'abc'), (2, b'de')])
+
+    def test_should_skip_detected_terminator(self):
+        stream = io.BytesIO(b'abc\r\ndef\r\nghi')
+        response = list(streams.iter_stride(stream, 3, chunk_size=4))
+        self.assertEqual(response, [(1, b'abc'), (2, b'def'), (3, b'ghi')])
+
+    def test_should_read_text_streams_without_terminator(self):
+        stream = io.StringIO(u'abcdef')
+        response = list(streams.iter_stride(stream, 3))
+        self.assertEqual(response, [(1, u'abc'), (2, u'def')])
+
+    def test_should_skip_detected_terminator_in_text_streams(self):
+        stream = io.StringIO(u'abc12\nxyz34\n')
+        response = list(streams.iter_stride(stream, 5, chunk_size=4))
+        self.assertEqual(response, [(1, u'abc12'), (2, u'xyz34')])
+
+
+class TestIsSingleByte(unittest.TestCase):
+    def test_single_byte_encodings(self):
+        for encoding in ('latin-1', 'ascii', 'cp1252', 'cp850'):
+            self.assertTrue(streams.is_single_byte(encoding), encoding)
+
+    def test_multi_byte_encodings(self):
+        for encoding in ('utf-8', 'utf-16', 'shift_jis'):
+            self.assertFalse(streams.is_single_byte(encoding), encoding)
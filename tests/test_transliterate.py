@@ -0,0 +1,30 @@
+# coding: utf-8
+import unicodedata
+
+import unittest
+
+from fixedwidthtext import transliterate
+
+
+def reference(value):
+    return unicodedata.normalize('NFKD', value).encode(
+        'ascii', 'ignore').decode('ascii')
+
+
+class TestTransliterate(unittest.TestCase):
+    def test_should_keep_ascii(self):
+        self.assertEqual(transliterate.to_ascii(u'Joao'), u'Joao')
+
+    def test_should_match_nfkd_for_latin1(self):
+        value = u''.join(chr(code) for code in range(0x20, 0x100))
+        self.assertEqual(
+            transliterate.transliterate(value), reference(value))
+
+    def test_should_fall_back_to_nfkd_outside_latin1(self):
+        value = u'Ærøskøbing Œuvre Łódź ﬁm'
+        self.assertEqual(
+            transliterate.transliterate(value), reference(value))
+
+    def test_should_return_str(self):
+        self.assertEqual(
+            transliterate.to_ascii(u'Conceição'), u'Conceicao')
@@ -0,0 +1,75 @@
+import io
+
+import unittest
+
+from fixedwidthtext import exceptions, fields, validation
+from fixedwidthtext.models import LineManager
+
+
+class Payment(LineManager):
+    kind = fields.CharField(size=1)
+    amount = fields.IntegerField(size=4)
+    due = fields.DateField()
+
+    class Meta:
+        lazy = True
+
+
+class TestValidateLines(unittest.TestCase):
+    def setUp(self):
+        self.lines = [
+            'A001220160604',
+            'B00xx20161304',
+            'C0001',
+            'D004520160101']
+
+    def test_should_keep_valid_records(self):
+        report = Payment.validate_lines(self.lines)
+        self.assertEqual([r.amount for r in report.records], [12, 45])
+        self.assertEqual(report.lines, 4)
+        self.assertEqual(report.invalid_lines, 2)
+        self.assertFalse(report.valid)
+
+    def test_should_report_structured_errors(self):
+        report = Payment.validate_lines(self.lines)
+        errors = [(e.line_number, e.field, e.offset, e.raw_value, e.code)
+                  for e in report.errors]
+        self.assertEqual(errors, [
+            (2, 'amount', 1, '00xx', 'invalid'),
+            (2, 'due', 5, '20161304', 'invalid_value'),
+            (3, None, 0, 'C0001', 'size')])
+
+    def test_should_stop_at_first_error(self):
+        report = Payment.validate_lines(self.lines, on_error=validation.STOP)
+        self.assertTrue(report.stopped)
+        self.assertEqual(report.lines, 2)
+
+    def test_should_stop_after_max_errors(self):
+        report = Payment.validate_lines(self.lines, max_errors=2)
+        self.assertTrue(report.stopped)
+        self.assertEqual(report.lines, 3)
+
+    def test_should_quarantine_invalid_lines(self):
+        quarantine = io.BytesIO()
+        Payment.validate_lines(self.lines, quarantine=quarantine)
+        self.assertEqual(quarantine.getvalue(), b'B00xx20161304\nC0001\n')
+
+    def test_should_not_keep_records_if_asked(self):
+        report = Payment.validate_lines(self.lines, keep_records=False)
+        self.assertEqual(report.records, [])
+
+    def test_should_validate_files(self):
+        content = '\r\n'.join(self.lines).encode('latin-1')
+        report = Payment.validate_file(io.BytesIO(content))
+        self.assertEqual([e.line_number for e in report.errors], [2, 2, 3])
+
+    def test_to_dicts_should_export_errors(self):
+        report = Payment.validate_lines(self.lines[:2])
+        self.assertEqual(report.to_dicts()[0]['field'], 'amount')
+
+
+class TestValidationErrorCode(unittest.TestCase):
+    def test_fields_should_set_error_codes(self):
+        with self.assertRaises(exceptions.ValidationError) as cm:
+            fields.IntegerField(size=2).clean('123', None)
+        self.assertEqual(cm.exception.code, 'max_size')